@@ -1,8 +1,23 @@
 from flask import Flask
+from app import admission, cache, change_feed, compression, db, freshness, live, profiling, search, snapshots
 from app.api import api_bp
+from app.json_provider import FastJSONProvider
 
 def create_app():
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+
+    # Profiling first: its after_request hook runs last and measures the others
+    profiling.init_app(app)
+    db.init_app(app)
+    cache.init_app(app)
+    freshness.init_app(app)
+    change_feed.init_app(app)
+    admission.init_app(app)
+    compression.init_app(app)
+    search.init_app(app)
+    snapshots.init_app(app)
+    live.init_app(app)
     
     # Register Blueprints
     app.register_blueprint(api_bp, url_prefix="/api")
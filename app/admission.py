@@ -0,0 +1,179 @@
+import threading
+import time
+from functools import wraps
+from flask import Response, jsonify, make_response
+from app.cache import UNCACHED_HEADERS, cache_key
+from app.db import pool_capacity
+from app.profiling import timing
+
+# Admission control for expensive endpoints
+#   - limited(): at most `concurrency` requests of a group run at once, up to `queue` more wait for a
+#     slot for at most `timeout` seconds; beyond that the request is shed with 503 and Retry-After
+#     (a streamed response keeps its slot until the stream is closed)
+#   - coalesced(): identical concurrent requests (same path and query) share one computation; the
+#     first runs the view and the others wait for its response instead of repeating the work
+# Groups whose requests hold a read connection (pool="read", the default) share at most
+# EXPENSIVE_POOL_SHARE of the read pool: their declared concurrencies are scaled down to it at startup,
+# so expensive endpoints cannot take every connection and leave cheap ones waiting on the pool
+# Group limits can be overridden with app.config["ADMISSION_LIMITS"] = {group: {"concurrency": ...}}
+
+DEFAULT_RETRY_AFTER = 5
+COALESCE_TIMEOUT = 30
+EXPENSIVE_POOL_SHARE = 0.5
+
+class Overloaded(Exception):
+    pass
+
+class Limiter:
+    def __init__(self, concurrency, queue, timeout, retry_after=DEFAULT_RETRY_AFTER, pool="read"):
+        self.declared_concurrency = concurrency
+        self.pool = pool
+        self.concurrency = concurrency
+        self.queue = queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            if self.active < self.concurrency:
+                self.active += 1
+                return
+            if self.waiting >= self.queue:
+                self.rejected += 1
+                raise Overloaded()
+
+            self.waiting += 1
+            try:
+                deadline = time.monotonic() + self.timeout
+                while self.active >= self.concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        raise Overloaded()
+                    self._condition.wait(remaining)
+                self.active += 1
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+    def configure(self, concurrency=None, queue=None, timeout=None, retry_after=None):
+        with self._condition:
+            self.concurrency = concurrency or self.concurrency
+            self.queue = queue if queue is not None else self.queue
+            self.timeout = timeout if timeout is not None else self.timeout
+            self.retry_after = retry_after or self.retry_after
+
+    def stats(self):
+        with self._condition:
+            return {
+                "concurrency": self.concurrency,
+                "active": self.active,
+                "waiting": self.waiting,
+                "rejected": self.rejected
+            }
+
+limiters = {}
+
+def get_limiter(group, concurrency, queue, timeout, pool="read"):
+    if group not in limiters:
+        limiters[group] = Limiter(concurrency, queue, timeout, pool=pool)
+    return limiters[group]
+
+def fit_to_pool(budget):
+    # Scales the declared concurrencies of the read-pool groups so that together they fit in the budget
+    pooled = [limiter for limiter in limiters.values() if limiter.pool == "read"]
+    declared = sum(limiter.declared_concurrency for limiter in pooled)
+    if not declared or declared <= budget:
+        return
+    for limiter in pooled:
+        limiter.configure(concurrency=max(1, limiter.declared_concurrency * budget // declared))
+
+def overloaded_response(limiter):
+    response = jsonify({"error": "Server busy, retry later"})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(limiter.retry_after)
+    return response
+
+def limited(group, concurrency=4, queue=8, timeout=5, pool="read"):
+    # pool=None for groups whose requests do not keep a read connection for their duration
+    limiter = get_limiter(group, concurrency, queue, timeout, pool)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                with timing("queue"):
+                    limiter.acquire()
+            except Overloaded:
+                return overloaded_response(limiter)
+
+            try:
+                response = make_response(view(*args, **kwargs))
+            except Exception:
+                limiter.release()
+                raise
+
+            if response.is_streamed:
+                response.call_on_close(limiter.release)
+            else:
+                limiter.release()
+            return response
+        return wrapper
+    return decorator
+
+class Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+def coalesced(view):
+    # Only for buffered responses: followers rebuild the leader's status, headers and body
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = cache_key()
+        with _flights_lock:
+            flight = _flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _flights[key] = Flight()
+
+        if not leader:
+            with timing("coalesce"):
+                finished = flight.done.wait(COALESCE_TIMEOUT)
+            if finished and flight.result is not None:
+                status, headers, body = flight.result
+                response = Response(body, status=status, headers=headers)
+                response.headers["X-Coalesced"] = "1"
+                return response
+            # The leader failed or is too slow: compute independently
+            return view(*args, **kwargs)
+
+        try:
+            response = make_response(view(*args, **kwargs))
+            if not response.is_streamed:
+                headers = [(name, value) for name, value in response.headers if name not in UNCACHED_HEADERS]
+                flight.result = (response.status_code, headers, response.get_data())
+            return response
+        finally:
+            with _flights_lock:
+                _flights.pop(key, None)
+            flight.done.set()
+    return wrapper
+
+def init_app(app):
+    share = app.config.get("ADMISSION_POOL_SHARE", EXPENSIVE_POOL_SHARE)
+    fit_to_pool(max(1, int(pool_capacity(app.config, "read") * share)))
+    for group, limits in app.config.get("ADMISSION_LIMITS", {}).items():
+        if group in limiters:
+            limiters[group].configure(**limits)
@@ -5,3 +5,6 @@ api_bp = Blueprint("api", __name__)
 @api_bp.route("/status", methods=["GET"])
 def status():
     return jsonify({"status": "API is running", "message": "Welcome to the Basketball Data Center"}), 200
+
+# Route modules register themselves on api_bp
+from app.api import batch, exports, games, leaders, live, metrics, people, search, season_stats, shotcharts, standings  # noqa: E402,F401
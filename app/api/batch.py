@@ -0,0 +1,77 @@
+from flask import jsonify, request
+from app.api import api_bp
+from app.cache import cached
+from app.db import read_only
+from app.freshness import conditional
+from app.queries import get_games, get_people, get_teams
+
+# Batch lookups by primary key
+# A page that needs many people, teams and games resolves each resource with one `= ANY` query
+# (/api/people?codes=..., /api/teams?codes=..., /api/games?codes=...) or all of them in a single
+# request to /api/batch, which runs every lookup on the same pooled connection
+
+MAX_BATCH_CODES = 100
+
+# resource -> (lookup, key column, tables it reads)
+RESOURCES = {
+    "people": (get_people, "person_code", ["people"]),
+    "teams": (get_teams, "team_code", ["teams"]),
+    "games": (get_games, "gamecode", ["games"])
+}
+
+BATCH_TABLES = [table for _, _, tables in RESOURCES.values() for table in tables]
+
+def parse_codes(value):
+    codes = list(dict.fromkeys(code.strip() for code in value.split(",") if code.strip()))
+    if not codes:
+        raise ValueError("codes must list at least one code")
+    if len(codes) > MAX_BATCH_CODES:
+        raise ValueError(f"At most {MAX_BATCH_CODES} codes per resource")
+    return codes
+
+def resolve(resource, codes):
+    # Rows follow the order of the requested codes; unknown codes are reported instead of failing
+    lookup, key, _ = RESOURCES[resource]
+    found = {row[key]: row for row in lookup(codes)}
+    return {
+        "data": [found[code] for code in codes if code in found],
+        "missing": [code for code in codes if code not in found]
+    }
+
+def batch_response(resource):
+    try:
+        codes = parse_codes(request.args.get("codes", ""))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(resolve(resource, codes)), 200
+
+@api_bp.route("/people", methods=["GET"])
+@read_only
+@conditional(tables=["people"])
+@cached(tables=["people"])
+def list_people():
+    return batch_response("people")
+
+@api_bp.route("/teams", methods=["GET"])
+@read_only
+@conditional(tables=["teams"])
+@cached(tables=["teams"])
+def list_teams():
+    return batch_response("teams")
+
+@api_bp.route("/batch", methods=["GET"])
+@read_only
+@conditional(tables=BATCH_TABLES)
+@cached(tables=BATCH_TABLES)
+def batch():
+    # /api/batch?people=P1,P2&teams=T1&games=G1 -> {"people": {...}, "teams": {...}, "games": {...}}
+    requested = {resource: request.args[resource] for resource in RESOURCES if resource in request.args}
+    if not requested:
+        return jsonify({"error": f"Request at least one of: {', '.join(RESOURCES)}"}), 400
+
+    try:
+        codes = {resource: parse_codes(value) for resource, value in requested.items()}
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({resource: resolve(resource, resource_codes) for resource, resource_codes in codes.items()}), 200
@@ -0,0 +1,120 @@
+import csv
+import io
+import uuid
+import zlib
+from flask import Response, current_app, jsonify, request, stream_with_context
+from app.admission import limited
+from app.api import api_bp
+from app.db import get_db, read_only
+
+# Streaming exports of play_by_play and shot_data as NDJSON or CSV
+# Rows come from a server-side (named) cursor in batches of EXPORT_BATCH_ROWS, are encoded into
+# chunks of about EXPORT_CHUNK_BYTES and gzip-compressed incrementally when the client accepts it,
+# so worker memory stays flat whatever the size of the export
+
+EXPORT_BATCH_ROWS = 2000
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+PBP_COLUMNS = [
+    "gamecode", "play_number", "team_code", "person_code", "period", "time_string",
+    "event_type", "description", "points_a", "points_b", "season_code"
+]
+
+SHOT_COLUMNS = [
+    "gamecode", "play_number", "team_code", "person_code", "period", "time_string",
+    "event_type", "description", "season_code", "points_scored", "points_a", "points_b",
+    "coord_x", "coord_y", "zone", "fastbreak", "second_chance", "points_off_turnover", "timestamp_utc"
+]
+
+EXPORTS = {
+    "pbp": ("play_by_play_view", PBP_COLUMNS),
+    "shots": ("shot_data_view", SHOT_COLUMNS)
+}
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+def encode_ndjson(columns, rows):
+    dumps = current_app.json.dumps
+    return "".join(dumps(dict(zip(columns, row))) + "\n" for row in rows)
+
+def encode_csv(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+def iter_rows(query, params):
+    # Named cursors fetch itersize rows per round trip instead of the whole result
+    with get_db().cursor(name=f"export_{uuid.uuid4().hex}") as cur:
+        cur.itersize = EXPORT_BATCH_ROWS
+        cur.execute(query, params)
+        while True:
+            rows = cur.fetchmany(EXPORT_BATCH_ROWS)
+            if not rows:
+                break
+            yield rows
+
+def generate_export(query, params, columns, fmt, compress):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    pending = []
+    pending_size = 0
+
+    def emit(text):
+        data = text.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    if fmt == "csv":
+        pending.append(encode_csv([columns]))
+
+    for rows in iter_rows(query, params):
+        text = encode_csv(rows) if fmt == "csv" else encode_ndjson(columns, rows)
+        pending.append(text)
+        pending_size += len(text)
+
+        if pending_size >= EXPORT_CHUNK_BYTES:
+            chunk = emit("".join(pending))
+            pending, pending_size = [], 0
+            if chunk:
+                yield chunk
+
+    chunk = emit("".join(pending))
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+def export_response(kind, condition, params, file_name):
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in FORMATS:
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+
+    view, columns = EXPORTS[kind]
+    query = f"SELECT {', '.join(columns)} FROM {view} WHERE {condition} ORDER BY gamecode, play_number"
+    compress = "gzip" in request.accept_encodings
+
+    response = Response(
+        stream_with_context(generate_export(query, params, columns, fmt, compress)),
+        mimetype=FORMATS[fmt]
+    )
+    response.headers["Vary"] = "Accept-Encoding"
+    if compress:
+        response.headers["Content-Encoding"] = "gzip"
+    if fmt == "csv":
+        response.headers["Content-Disposition"] = f"attachment; filename={file_name}.csv"
+    return response
+
+@api_bp.route("/games/<gamecode>/<any(pbp, shots):kind>", methods=["GET"])
+@read_only
+@limited("exports", concurrency=4, queue=8, timeout=5)
+def export_game_events(gamecode, kind):
+    # The season prefix of the gamecode prunes the scan to a single partition
+    season_code = gamecode.split("_")[0]
+    return export_response(kind, "season_code = %s AND gamecode = %s", (season_code, gamecode), f"{gamecode}_{kind}")
+
+@api_bp.route("/seasons/<season_code>/<any(pbp, shots):kind>", methods=["GET"])
+@read_only
+@limited("season_exports", concurrency=2, queue=2, timeout=2)
+def export_season_events(season_code, kind):
+    return export_response(kind, "season_code = %s", (season_code,), f"{season_code}_{kind}")
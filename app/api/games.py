@@ -0,0 +1,124 @@
+import base64
+import json
+from datetime import datetime
+from flask import Response, jsonify, request
+from app.api import api_bp
+from app.api.batch import batch_response
+from app.cache import cached
+from app.db import read_only
+from app.freshness import conditional
+from app.queries import GAME_FIELDS, get_game, get_game_summary, get_games_page, get_player_game_stats, get_team_game_stats
+
+# Games listing with keyset pagination
+# Pages are ordered by (utc_date, gamecode) and the cursor carries the last key of the previous page,
+# so every page is an index range scan of `limit` rows no matter how deep it is
+# Games without utc_date cannot be placed in that order and are not listed
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+def encode_cursor(utc_date, gamecode):
+    raw = json.dumps([utc_date.isoformat(), gamecode]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    value = json.loads(base64.urlsafe_b64decode(padded))
+    if not isinstance(value, list) or len(value) != 2 or not all(isinstance(part, str) for part in value):
+        raise ValueError("Invalid cursor")
+    utc_date, gamecode = value
+    return datetime.fromisoformat(utc_date), gamecode
+
+def parse_games_query(args):
+    fields = args.get("fields")
+    fields = fields.split(",") if fields else GAME_FIELDS
+    unknown = [field for field in fields if field not in GAME_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    limit = args.get("limit", DEFAULT_LIMIT, type=int)
+    if limit is None or not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+
+    played = args.get("played")
+    if played is not None and played not in ("true", "false"):
+        raise ValueError("played must be true or false")
+
+    round_number = args.get("round_number")
+    if round_number is not None and not round_number.isdigit():
+        raise ValueError("round_number must be an integer")
+
+    cursor = args.get("cursor")
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+    return {
+        "fields": fields,
+        "limit": limit,
+        "season_code": args.get("season_code"),
+        "round_number": int(round_number) if round_number is not None else None,
+        "team": args.get("team"),
+        "played": None if played is None else played == "true",
+        "after": after
+    }
+
+@api_bp.route("/games", methods=["GET"])
+@read_only
+@conditional(tables=["games"])
+@cached(tables=["games"])
+def list_games():
+    # ?codes=... turns the listing into a batch lookup by gamecode
+    if "codes" in request.args:
+        return batch_response("games")
+
+    try:
+        params = parse_games_query(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    rows = get_games_page(**params)
+    has_more = len(rows) > params["limit"]
+    rows = rows[:params["limit"]]
+    next_cursor = encode_cursor(rows[-1]["utc_date"], rows[-1]["gamecode"]) if has_more else None
+
+    data = [{field: row[field] for field in params["fields"]} for row in rows]
+
+    return jsonify({"data": data, "next_cursor": next_cursor}), 200
+
+@api_bp.route("/games/<gamecode>", methods=["GET"])
+@read_only
+@conditional(tables=["games"], key_arg="gamecode")
+@cached(tables=["games"], key_arg="gamecode")
+def get_game_detail(gamecode):
+    game = get_game(gamecode)
+    if game is None:
+        return jsonify({"error": "Game not found"}), 404
+    return jsonify(game), 200
+
+@api_bp.route("/games/<gamecode>/boxscore", methods=["GET"])
+@read_only
+@conditional(tables=["games", "player_game_stats", "team_game_stats"], key_arg="gamecode")
+@cached(tables=["games", "player_game_stats", "team_game_stats"], key_arg="gamecode")
+def get_boxscore(gamecode):
+    game = get_game(gamecode)
+    if game is None:
+        return jsonify({"error": "Game not found"}), 404
+
+    return jsonify({
+        "game": game,
+        "teams": get_team_game_stats(gamecode),
+        "players": get_player_game_stats(gamecode)
+    }), 200
+
+@api_bp.route("/games/<gamecode>/summary", methods=["GET"])
+@read_only
+@conditional(tables=["game_summaries"], key_arg="gamecode")
+@cached(tables=["game_summaries"], key_arg="gamecode")
+def get_summary(gamecode):
+    # Precomputed by ingest/build_game_summaries.py for played games
+    summary = get_game_summary(gamecode)
+    if summary is None:
+        return jsonify({"error": "Game summary not found"}), 404
+    return Response(summary, mimetype="application/json"), 200
@@ -0,0 +1,55 @@
+from flask import jsonify, request
+from app.admission import coalesced, limited
+from app.api import api_bp
+from app.cache import cached
+from app.db import read_only
+from app.freshness import conditional
+from app.queries import LEADER_ORDERINGS, get_leaders
+
+# Player leaderboards read from the player_leaderboards materialized view
+# (ingest/migrations/0007_player_leaderboards.sql), ordered through the index of the requested normalization
+
+STATS = [
+    "points", "pir", "rebounds", "offensive_rebounds", "defensive_rebounds", "assists", "steals",
+    "blocks", "turnovers", "field_goals_2_made", "field_goals_3_made", "free_throws_made",
+    "fouls_drawn", "plus_minus"
+]
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+
+@api_bp.route("/leaders", methods=["GET"])
+@read_only
+@conditional(tables=["player_leaderboards"])
+@cached(tables=["player_leaderboards"])
+@coalesced
+@limited("leaders", concurrency=8, queue=16, timeout=5)
+def list_leaders():
+    season_code = request.args.get("season_code")
+    phase_type = request.args.get("phase_type", "RS")
+    stat = request.args.get("stat", "points")
+    per = request.args.get("per", "game")
+    limit = request.args.get("limit", DEFAULT_LIMIT, type=int)
+    min_games = request.args.get("min_games", 1, type=int)
+
+    if not season_code:
+        return jsonify({"error": "season_code is required"}), 400
+    if stat not in STATS:
+        return jsonify({"error": f"stat must be one of: {', '.join(STATS)}"}), 400
+    if per not in LEADER_ORDERINGS:
+        return jsonify({"error": "per must be total, game or 40"}), 400
+    if limit is None or not 1 <= limit <= MAX_LIMIT:
+        return jsonify({"error": f"limit must be between 1 and {MAX_LIMIT}"}), 400
+    if min_games is None:
+        return jsonify({"error": "min_games must be an integer"}), 400
+
+    rows = get_leaders(season_code, phase_type, stat, per, min_games, limit)
+    leaders = [{"rank": position, **row} for position, row in enumerate(rows, start=1)]
+
+    return jsonify({
+        "season_code": season_code,
+        "phase_type": phase_type,
+        "stat": stat,
+        "per": per,
+        "data": leaders
+    }), 200
@@ -0,0 +1,85 @@
+import queue
+from flask import Response, current_app, jsonify, request
+from app.admission import limited
+from app.api import api_bp
+from app.cache import season_of_gamecode
+from app.live import end_part, game_score, is_finished, live_broadcaster, play_part, score_part
+from app.queries import get_game, get_play_by_play_since
+
+# Server-Sent Events stream of a game in progress
+# The view reads the backlog (plays after Last-Event-ID, the score) and returns; the stream itself only
+# waits on its subscriber queue, so an open stream holds no database connection and every update of the
+# game costs one read in the shared broadcaster whatever the number of clients (see app/live.py)
+# Not read_only: the backlog comes from the primary, like the updates, so no play falls between the two
+
+HEARTBEAT_SECONDS = 15
+RETRY_MS = 5000
+
+def last_event_id():
+    value = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    return int(value) if value and value.isdigit() else 0
+
+def generate_stream(subscriber, backlog, sent, finished):
+    yield f"retry: {RETRY_MS}\n\n"
+    yield "".join(text for _, _, text in backlog)
+
+    while not finished:
+        try:
+            message = subscriber.messages.get(timeout=HEARTBEAT_SECONDS)
+        except queue.Empty:
+            if subscriber.dropped:
+                break
+            # Comment line: keeps proxies from closing an idle stream and detects gone clients
+            yield ": keepalive\n\n"
+            continue
+
+        chunk = []
+        for event, event_id, text in message:
+            if event == "play":
+                if event_id <= sent:
+                    continue
+                sent = event_id
+            elif event == "end":
+                finished = True
+            chunk.append(text)
+        if chunk:
+            yield "".join(chunk)
+
+@api_bp.route("/live/<gamecode>/stream", methods=["GET"])
+# Not counted against the read pool: the view reads the primary and its connection goes back when it returns
+@limited("live_streams", concurrency=500, queue=0, timeout=0, pool=None)
+def stream_game(gamecode):
+    game = get_game(gamecode)
+    if game is None:
+        return jsonify({"error": "Game not found"}), 404
+
+    after = last_event_id()
+    subscriber = None if game["played"] else live_broadcaster.subscribe(gamecode)
+    try:
+        events = get_play_by_play_since(gamecode, season_of_gamecode(gamecode), after)
+        # Re-read once subscribed, so the score is not older than the backlog
+        game = get_game(gamecode) if subscriber is not None else game
+    except Exception:
+        if subscriber is not None:
+            live_broadcaster.unsubscribe(gamecode, subscriber)
+        raise
+
+    dumps = current_app.json.dumps
+    score = game_score(game)
+    sent = events[-1]["play_number"] if events else after
+    finished = is_finished(game, events)
+    backlog = [play_part(dumps, event) for event in events] + [score_part(dumps, score)]
+    if finished:
+        backlog.append(end_part(dumps, gamecode))
+    # A Last-Event-ID past the end of the game says nothing about where the game stands
+    if subscriber is not None and (events or not after):
+        live_broadcaster.seed(gamecode, sent, score)
+
+    response = Response(generate_stream(subscriber, backlog, sent, finished), mimetype="text/event-stream")
+    if subscriber is not None:
+        # On close, also when the client is gone before the first chunk
+        response.call_on_close(lambda: live_broadcaster.unsubscribe(gamecode, subscriber))
+    response.headers["Cache-Control"] = "no-cache"
+    # Nginx would otherwise buffer the stream
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
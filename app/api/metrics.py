@@ -0,0 +1,18 @@
+from flask import jsonify
+from app.admission import limiters
+from app.api import api_bp
+from app.cache import response_cache
+from app.live import live_broadcaster
+from app.profiling import request_metrics
+
+# Per-endpoint latency histograms, slow-request samples with their SQL, response cache counters and
+# admission control state and live stream subscribers of this worker process
+
+@api_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    return jsonify({
+        **request_metrics.snapshot(),
+        "response_cache": response_cache.stats(),
+        "admission": {group: limiter.stats() for group, limiter in sorted(limiters.items())},
+        "live": live_broadcaster.stats()
+    }), 200
@@ -0,0 +1,16 @@
+from flask import jsonify
+from app.api import api_bp
+from app.cache import cached
+from app.db import read_only
+from app.freshness import conditional
+from app.queries import get_person
+
+@api_bp.route("/people/<person_code>", methods=["GET"])
+@read_only
+@conditional(tables=["people"])
+@cached(tables=["people"])
+def get_person_detail(person_code):
+    person = get_person(person_code)
+    if person is None:
+        return jsonify({"error": "Person not found"}), 404
+    return jsonify(person), 200
@@ -0,0 +1,32 @@
+from flask import jsonify, request
+from app.api import api_bp
+from app.search import ensure_index, search_index
+
+# Autocomplete over people and teams, answered from the in-memory index (app/search.py)
+
+# Single characters match a large share of all names
+MIN_QUERY_LENGTH = 2
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+KINDS = {
+    "people": "person",
+    "teams": "team"
+}
+
+@api_bp.route("/search", methods=["GET"])
+def search():
+    text = request.args.get("q", "")
+    limit = request.args.get("limit", DEFAULT_LIMIT, type=int)
+    kind = request.args.get("type")
+
+    if len(text.strip()) < MIN_QUERY_LENGTH:
+        return jsonify({"error": f"q must have at least {MIN_QUERY_LENGTH} characters"}), 400
+    if limit is None or not 1 <= limit <= MAX_LIMIT:
+        return jsonify({"error": f"limit must be between 1 and {MAX_LIMIT}"}), 400
+    if kind is not None and kind not in KINDS:
+        return jsonify({"error": "type must be people or teams"}), 400
+
+    ensure_index()
+    results = search_index.search(text, limit, KINDS.get(kind))
+    return jsonify({"query": text, "data": results}), 200
@@ -0,0 +1,27 @@
+from flask import jsonify, request
+from app.api import api_bp
+from app.cache import cached
+from app.db import read_only
+from app.freshness import conditional
+from app.queries import get_player_season_stats, get_team_season_stats
+
+# Season totals of every player (per phase) and every team
+
+@api_bp.route("/seasons/<season_code>/stats/players", methods=["GET"])
+@read_only
+@conditional(tables=["player_season_stats"])
+@cached(tables=["player_season_stats"])
+def list_player_season_stats(season_code):
+    phase_type = request.args.get("phase_type", "RS")
+    return jsonify({
+        "season_code": season_code,
+        "phase_type": phase_type,
+        "data": get_player_season_stats(season_code, phase_type)
+    }), 200
+
+@api_bp.route("/seasons/<season_code>/stats/teams", methods=["GET"])
+@read_only
+@conditional(tables=["team_season_stats"])
+@cached(tables=["team_season_stats"])
+def list_team_season_stats(season_code):
+    return jsonify({"season_code": season_code, "data": get_team_season_stats(season_code)}), 200
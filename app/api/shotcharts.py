@@ -0,0 +1,78 @@
+import json
+import struct
+from flask import Response, jsonify, request
+from app.admission import coalesced, limited
+from app.api import api_bp
+from app.cache import cached
+from app.db import read_only
+from app.freshness import conditional
+from app.shot_bins import BINNERS, aggregate_shots
+from app.shots import fetch_shot_columns, get_zone_names
+
+# Compact binary shot chart
+# Layout (little-endian):
+#   header  "BDCS" | version uint8 | padding uint8 | count uint32      (10 bytes)
+#   coord_x int16[count] | coord_y int16[count]
+#   points  uint8[count] | zone uint8[count] | flags uint8[count]
+# flags: 1 fastbreak, 2 second chance, 4 points off turnover, 8 free throw; zone 0 means unknown
+# Zone names for the codes are sent as JSON in the X-Shot-Zones header
+# Offsets of the int16 arrays are even, so they can be viewed directly as Int16Array
+
+SHOTCHART_MAGIC = b"BDCS"
+SHOTCHART_VERSION = 1
+
+@api_bp.route("/seasons/<season_code>/shotchart.bin", methods=["GET"])
+@read_only
+@conditional(tables=["shot_data"])
+@cached(tables=["shot_data"])
+@coalesced
+@limited("shotcharts", concurrency=4, queue=8, timeout=10)
+def binary_shotchart(season_code):
+    columns = fetch_shot_columns(
+        season_code,
+        team_code=request.args.get("team"),
+        person_code=request.args.get("person_code")
+    )
+
+    body = b"".join([
+        struct.pack("<4sBxI", SHOTCHART_MAGIC, SHOTCHART_VERSION, columns["count"]),
+        columns["coord_x"].tobytes(),
+        columns["coord_y"].tobytes(),
+        columns["points"].tobytes(),
+        columns["zone"].tobytes(),
+        columns["flags"].tobytes()
+    ])
+
+    response = Response(body, mimetype="application/octet-stream")
+    response.headers["X-Shot-Zones"] = json.dumps(get_zone_names())
+    return response
+
+# Aggregated shot chart: FG% and volume per hexagon or grid cell and per zone, with league baselines
+# Responses are cached per (season, team/player, bin mode, bin size) through the query string
+MIN_BIN_SIZE = 10
+MAX_BIN_SIZE = 500
+
+@api_bp.route("/seasons/<season_code>/shotchart", methods=["GET"])
+@read_only
+@conditional(tables=["shot_data"])
+@cached(tables=["shot_data"])
+@coalesced
+@limited("shotcharts", concurrency=4, queue=8, timeout=10)
+def aggregated_shotchart(season_code):
+    mode = request.args.get("bin", "hex")
+    size = request.args.get("size", 50, type=int)
+
+    if mode not in BINNERS:
+        return jsonify({"error": "bin must be hex or grid"}), 400
+    if size is None or not MIN_BIN_SIZE <= size <= MAX_BIN_SIZE:
+        return jsonify({"error": f"size must be between {MIN_BIN_SIZE} and {MAX_BIN_SIZE}"}), 400
+
+    result = aggregate_shots(
+        season_code,
+        mode=mode,
+        size=size,
+        team_code=request.args.get("team"),
+        person_code=request.args.get("person_code")
+    )
+
+    return jsonify({"season_code": season_code, "bin": mode, "size": size, **result}), 200
@@ -0,0 +1,24 @@
+from flask import jsonify, request
+from app.api import api_bp
+from app.cache import cached
+from app.db import read_only
+from app.freshness import conditional
+from app.queries import get_standings
+
+# Standings of a season after a given round (the latest stored round by default)
+
+@api_bp.route("/seasons/<season_code>/standings", methods=["GET"])
+@read_only
+@conditional(tables=["standings"])
+@cached(tables=["standings"])
+def list_standings(season_code):
+    round_number = request.args.get("round_number")
+    if round_number is not None and not round_number.isdigit():
+        return jsonify({"error": "round_number must be an integer"}), 400
+
+    rows = get_standings(season_code, int(round_number) if round_number is not None else None)
+    return jsonify({
+        "season_code": season_code,
+        "round_number": rows[0]["round_number"] if rows else None,
+        "data": rows
+    }), 200
@@ -0,0 +1,218 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+from flask import Response, make_response, request
+from sqlalchemy import text
+from app import db
+from ingest.changes import data_committed
+
+# In-process response cache for api_bp routes
+# LRU with a per-entry TTL and a bound on the total cached bytes, keyed by path and sorted query params
+# Entries are tagged with the (table, season_code, key) they were built from and dropped when an
+# ingest stage publishes a change for that table and season (ingest.changes.data_committed, relayed
+# from the ingest processes by app/change_feed.py); when the change lists keys (gamecodes), entries
+# built for a single other game are kept
+# Invalidation is driven by the change feed, the TTL is only a backstop. Since the notification comes from
+# the primary and read-only views read a replica, a response is only stored when
+#   - no invalidation of its tables and season arrived while the view was running (generations), and
+#   - the replica had already reached the data version announced by the last change of those tables
+#     (checked against the replica's data_versions, only while such a version is pending)
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL = 3600
+
+# Recomputed on every response
+UNCACHED_HEADERS = ("Content-Length", "Set-Cookie", "X-Cache", "X-Coalesced")
+
+# Generation key counting every invalidation of a table, whatever its season
+ALL_SEASONS = "*"
+
+class ResponseCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, default_ttl=DEFAULT_TTL):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        # (table, season_code) -> number of invalidations; clear() bumps the epoch
+        self._generations = {}
+        self._epoch = 0
+        # (table, data_versions season_code) -> version announced by the primary, not yet seen on the replica
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["expires"] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, body, headers, tags, ttl=None):
+        size = len(key) + len(body)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = {
+                "body": body,
+                "headers": headers,
+                "tags": tags,
+                "size": size,
+                "expires": time.monotonic() + (ttl or self.default_ttl)
+            }
+            self._size += size
+
+            # Evict least recently used entries until the byte bound holds
+            while self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def generation(self, tags):
+        # Changes whenever an invalidation could have dropped an entry with these tags
+        with self._lock:
+            counts = [self._epoch]
+            for table, season_code, _ in tags:
+                if season_code is None:
+                    counts.append(self._generations.get((table, ALL_SEASONS), 0))
+                else:
+                    counts.append(self._generations.get((table, season_code), 0))
+                    counts.append(self._generations.get((table, None), 0))
+            return counts
+
+    def pending_versions(self, tags):
+        with self._lock:
+            if not self._pending:
+                return {}
+            pending = {}
+            for table, season_code, _ in tags:
+                for (pending_table, pending_season), version in self._pending.items():
+                    if pending_table == table and (season_code is None or pending_season in (season_code, "")):
+                        pending[(pending_table, pending_season)] = version
+            return pending
+
+    def confirm_versions(self, seen):
+        # seen: (table, season_code) -> version read on the replica
+        with self._lock:
+            for key, version in seen.items():
+                if key in self._pending and self._pending[key] <= version:
+                    del self._pending[key]
+
+    def invalidate(self, table, season_code=None, keys=None, version=None):
+        # A change without season drops every entry of the table; entries built without a
+        # season filter depend on all seasons and are dropped by any change of their table.
+        # Changed keys narrow it down to entries built for one of them or for no key at all
+        keys = set(keys or ())
+        with self._lock:
+            for generation_key in ((table, season_code), (table, ALL_SEASONS)):
+                self._generations[generation_key] = self._generations.get(generation_key, 0) + 1
+            if version is not None:
+                pending_key = (table, season_code or "")
+                self._pending[pending_key] = max(version, self._pending.get(pending_key, 0))
+
+            for key, entry in list(self._entries.items()):
+                for tag_table, tag_season, tag_key in entry["tags"]:
+                    if tag_table != table:
+                        continue
+                    if season_code is not None and tag_season not in (None, season_code):
+                        continue
+                    if keys and tag_key is not None and tag_key not in keys:
+                        continue
+                    self._remove(key)
+                    break
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._epoch += 1
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._size -= entry["size"]
+
+response_cache = ResponseCache()
+
+def cache_key():
+    params = sorted(request.args.items(multi=True))
+    return f"{request.path}?{urlencode(params)}"
+
+def season_of_gamecode(gamecode):
+    # Gamecodes start with their season code: E2024_123
+    return gamecode.split("_")[0]
+
+DATA_VERSIONS_OF_TABLES = text("""
+    SELECT table_name, season_code, version
+    FROM data_versions
+    WHERE table_name = ANY(:tables)
+""")
+
+def replica_caught_up(pending):
+    # True when the database of this request already shows every pending version
+    # Runs before admission control and coalescing: a connection of its own, returned at once, so a
+    # request waiting for a slot or for its leader does not hold one
+    if not pending:
+        return True
+    with db.get_engine(db.request_target()).connect() as conn:
+        rows = conn.execute(DATA_VERSIONS_OF_TABLES, {"tables": list({table for table, _ in pending})})
+        seen = {(table, season_code): version for table, season_code, version in rows}
+    response_cache.confirm_versions(seen)
+    return all(seen.get(key, 0) >= version for key, version in pending.items())
+
+def cached(tables, ttl=None, season_arg="season_code", key_arg=None):
+    # Caches successful responses of the decorated view; the season comes from the URL or query string,
+    # or from the gamecode named by key_arg for single-game routes
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = cache_key()
+            entry = response_cache.get(key)
+            if entry is not None:
+                response = Response(entry["body"], status=200, headers=entry["headers"])
+                response.headers["X-Cache"] = "HIT"
+                return response
+
+            entry_key = kwargs.get(key_arg) if key_arg else None
+            season_code = kwargs.get(season_arg) or request.args.get(season_arg)
+            if season_code is None and entry_key:
+                season_code = season_of_gamecode(entry_key)
+            tags = {(table, season_code, entry_key) for table in tables}
+            generation = response_cache.generation(tags)
+            storable = replica_caught_up(response_cache.pending_versions(tags))
+
+            response = make_response(view(*args, **kwargs))
+            # Coalesced copies are the leader's response, which its own request has already stored
+            if (response.status_code == 200 and not response.is_streamed and storable
+                    and "X-Coalesced" not in response.headers
+                    and response_cache.generation(tags) == generation):
+                headers = [(name, value) for name, value in response.headers if name not in UNCACHED_HEADERS]
+                response_cache.set(key, response.get_data(), headers, tags, ttl)
+
+            response.headers["X-Cache"] = "MISS"
+            return response
+        return wrapper
+    return decorator
+
+def invalidate_on_commit(table, season_code=None, keys=None, version=None, changed_at=None):
+    response_cache.invalidate(table, season_code, keys, version)
+
+def init_app(app):
+    response_cache.max_bytes = app.config.get("RESPONSE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+    response_cache.default_ttl = app.config.get("RESPONSE_CACHE_TTL", DEFAULT_TTL)
+    data_committed.connect(invalidate_on_commit)
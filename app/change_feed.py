@@ -0,0 +1,101 @@
+import json
+import logging
+import os
+import select
+import threading
+from datetime import datetime
+import psycopg2
+from app.cache import response_cache
+from app.freshness import table_versions
+from app.snapshots import discard_changed_seasons
+from ingest.changes import CHANGE_CHANNEL, data_committed
+from ingest.config import DB_CONFIG
+
+# Change feed from the ingest processes
+# Every API worker process runs one listener thread that LISTENs on CHANGE_CHANNEL and replays each
+# notification as ingest.changes.data_committed in this process, so the response cache, the search index,
+# shot chart baselines and static snapshots react to ingest commits as if they had happened here
+# NOTIFY is only delivered on the primary, so the listener uses DB_CONFIG even when reads go to a replica
+# Notifications sent while the listener is disconnected are lost; after reconnecting, the response cache
+# is cleared, the data versions are reloaded and static snapshots of seasons changed since they were built
+# are discarded instead
+
+logger = logging.getLogger(__name__)
+
+POLL_TIMEOUT = 5
+RECONNECT_DELAY = 5
+
+class ChangeListener(threading.Thread):
+    def __init__(self):
+        super().__init__(name="bdc-change-feed", daemon=True)
+        self.stopping = threading.Event()
+        self.connected_once = False
+
+    def run(self):
+        while not self.stopping.is_set():
+            try:
+                self.listen()
+            except (psycopg2.Error, OSError):
+                logger.exception("Change feed connection lost")
+            self.stopping.wait(RECONNECT_DELAY)
+
+    def listen(self):
+        conn = psycopg2.connect(**DB_CONFIG)
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CHANGE_CHANNEL};")
+
+            if self.connected_once:
+                response_cache.clear()
+                table_versions.reset()
+                discard_changed_seasons()
+            self.connected_once = True
+
+            while not self.stopping.is_set():
+                if select.select([conn], [], [], POLL_TIMEOUT) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    self.dispatch(conn.notifies.pop(0).payload)
+        finally:
+            conn.close()
+
+    def dispatch(self, payload):
+        try:
+            change = json.loads(payload)
+            table = change["table"]
+            changed_at = datetime.fromisoformat(change["changed_at"]) if change.get("changed_at") else None
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed change notification: %s", payload)
+            return
+
+        try:
+            data_committed.send(
+                table,
+                season_code=change.get("season_code"),
+                keys=change.get("keys") or [],
+                version=change.get("version"),
+                changed_at=changed_at
+            )
+        except Exception:
+            logger.exception("Change receiver failed for %s", table)
+
+_listener = None
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+def ensure_listener():
+    # Started lazily per process: threads do not survive a fork of a preloading server
+    global _listener, _listener_pid
+    if _listener_pid == os.getpid():
+        return
+    with _listener_lock:
+        if _listener_pid != os.getpid():
+            _listener = ChangeListener()
+            _listener.start()
+            _listener_pid = os.getpid()
+
+def init_app(app):
+    if app.config.get("CHANGE_FEED_ENABLED", True):
+        app.before_request(ensure_listener)
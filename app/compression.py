@@ -0,0 +1,64 @@
+import gzip
+from flask import request
+from app.profiling import timing
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - gzip only
+    brotli = None
+
+# Negotiated response compression for buffered responses
+# The encoding is picked from Accept-Encoding (brotli preferred over gzip on equal quality) and only
+# applied to compressible bodies of at least COMPRESSION_MIN_BYTES; streamed responses (exports) and
+# responses that already carry a Content-Encoding are left as they are
+
+DEFAULT_MIN_BYTES = 1024
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_BROTLI_QUALITY = 5
+
+COMPRESSIBLE_MIMETYPES = ("application/json", "application/x-ndjson", "application/octet-stream")
+
+def is_compressible(response):
+    mimetype = response.mimetype or ""
+    return mimetype.startswith("text/") or mimetype in COMPRESSIBLE_MIMETYPES
+
+def available_encodings():
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+def compress_body(data, encoding, config):
+    if encoding == "br":
+        quality = config.get("COMPRESSION_BROTLI_QUALITY", DEFAULT_BROTLI_QUALITY)
+        return brotli.compress(data, quality=quality)
+    level = config.get("COMPRESSION_GZIP_LEVEL", DEFAULT_GZIP_LEVEL)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+def init_app(app):
+    min_bytes = app.config.get("COMPRESSION_MIN_BYTES", DEFAULT_MIN_BYTES)
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.status_code != 200
+            or response.is_streamed
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or not is_compressible(response)
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        if response.content_length is not None and response.content_length < min_bytes:
+            return response
+
+        encoding = request.accept_encodings.best_match(available_encodings())
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < min_bytes:
+            return response
+
+        with timing("compress"):
+            response.set_data(compress_body(data, encoding, app.config))
+        response.headers["Content-Encoding"] = encoding
+        return response
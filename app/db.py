@@ -0,0 +1,89 @@
+from flask import current_app, g, request
+from sqlalchemy import create_engine
+from sqlalchemy.engine import URL
+from app.profiling import ProfilingCursor
+from ingest.config import DB_CONFIG, READ_DB_CONFIG
+
+# Pooled database access for the API
+# One SQLAlchemy engine per process and target keeps a pool of connections; each request checks out one
+# connection on first use and returns it to the pool on teardown. Core queries run on that connection
+# (app/queries.py) and code that needs psycopg2 features (named cursors, bytea buffers) uses its DBAPI
+# connection via get_db()
+#
+# Views marked @read_only are routed to the read engine (READ_DB_CONFIG: a replica, or the primary through
+# a pool of its own whose sessions refuse writes); everything else goes to the write engine (DB_CONFIG)
+
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+DEFAULT_POOL_RECYCLE = 1800
+
+TARGETS = {
+    "read": (READ_DB_CONFIG, "DB_READ_"),
+    "write": (DB_CONFIG, "DB_")
+}
+
+engines = {}
+
+def build_url(db_config):
+    return URL.create(
+        "postgresql+psycopg2",
+        username=db_config["user"],
+        password=db_config["password"],
+        host=db_config["host"],
+        port=int(db_config["port"]) if db_config["port"] else None,
+        database=db_config["dbname"]
+    )
+
+def pool_limits(config, prefix):
+    # Pool limits per target: DB_POOL_SIZE / DB_READ_POOL_SIZE, and so on
+    return (
+        config.get(f"{prefix}POOL_SIZE", DEFAULT_POOL_SIZE),
+        config.get(f"{prefix}MAX_OVERFLOW", DEFAULT_MAX_OVERFLOW)
+    )
+
+def pool_capacity(config, target):
+    # Connections a target can hand out at once
+    pool_size, max_overflow = pool_limits(config, TARGETS[target][1])
+    return pool_size + max_overflow
+
+def create_db_engine(db_config, config, prefix):
+    pool_size, max_overflow = pool_limits(config, prefix)
+    return create_engine(
+        build_url(db_config),
+        connect_args={"options": db_config["options"], "cursor_factory": ProfilingCursor},
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=config.get(f"{prefix}POOL_RECYCLE", DEFAULT_POOL_RECYCLE),
+        pool_pre_ping=True
+    )
+
+def read_only(view):
+    # Marks a view as read-only so its queries are routed to the read engine
+    view.read_only = True
+    return view
+
+def get_engine(target="read"):
+    return engines[target]
+
+def request_target():
+    view = current_app.view_functions.get(request.endpoint)
+    return "read" if getattr(view, "read_only", False) else "write"
+
+def get_connection():
+    if "db" not in g:
+        g.db = get_engine(request_target()).connect()
+    return g.db
+
+def get_db():
+    return get_connection().connection.dbapi_connection
+
+def close_db(exception=None):
+    # Closing returns the connection to the pool, rolling back whatever the request left open
+    db = g.pop("db", None)
+    if db is not None:
+        db.close()
+
+def init_app(app):
+    for target, (db_config, prefix) in TARGETS.items():
+        engines[target] = create_db_engine(db_config, app.config, prefix)
+    app.teardown_appcontext(close_db)
@@ -0,0 +1,128 @@
+import hashlib
+import threading
+import time
+from functools import wraps
+from flask import Response, make_response, request
+from sqlalchemy import text
+from app import db
+from app.cache import cache_key, response_cache, season_of_gamecode
+from ingest.changes import data_committed
+
+# Conditional responses driven by ingest freshness (data_versions, see ingest/changes.py)
+# The ETag hashes the request key with the versions of the tables a route reads, and Last-Modified is
+# the latest change of those tables. A matching If-None-Match / If-Modified-Since is answered with 304
+# before the view runs
+# The versions live in an in-process map, loaded from data_versions once and then updated with the
+# version carried by every change notification, so validators and 304s never touch the database.
+# Without the change feed (CHANGE_FEED_ENABLED off) the map is reloaded every VERSIONS_RELOAD_SECONDS
+# The map follows the primary while read-only views may read a lagging replica: as long as an announced
+# version is not confirmed on the replica (see cached()), responses go out without validators, so a body
+# read before the commit never carries the new ETag
+
+VERSIONS_RELOAD_SECONDS = 60
+
+DATA_VERSIONS = text("SELECT table_name, season_code, version, changed_at FROM data_versions")
+
+class TableVersions:
+    def __init__(self):
+        self.max_age = None
+        # (table, season_code or '') -> (version, changed_at)
+        self._versions = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        with db.get_engine("read").connect() as conn:
+            rows = conn.execute(DATA_VERSIONS).all()
+        with self._lock:
+            for table, season_code, version, changed_at in rows:
+                self._apply(table, season_code, version, changed_at)
+            self._loaded_at = time.monotonic()
+
+    def reset(self):
+        # Notifications may have been missed: reload on next use
+        with self._lock:
+            self._loaded_at = None
+
+    def ensure_loaded(self):
+        loaded_at = self._loaded_at
+        if loaded_at is None or (self.max_age is not None and time.monotonic() - loaded_at > self.max_age):
+            self.load()
+
+    def update(self, table, season_code, version, changed_at):
+        with self._lock:
+            self._apply(table, season_code or "", version, changed_at)
+
+    def _apply(self, table, season_code, version, changed_at):
+        # Versions only grow: a replica that lags behind the notifications cannot roll one back
+        current = self._versions.get((table, season_code))
+        if current is None or version > current[0]:
+            self._versions[(table, season_code)] = (version, changed_at)
+
+    def get(self, tables, season_code=None):
+        # Without a season the response depends on every season of the tables
+        self.ensure_loaded()
+        with self._lock:
+            rows = [
+                versions for (table, row_season), versions in self._versions.items()
+                if table in tables and (season_code is None or row_season in (season_code, ""))
+            ]
+        return (
+            len(rows),
+            sum(version for version, _ in rows),
+            max((changed_at for _, changed_at in rows), default=None)
+        )
+
+table_versions = TableVersions()
+
+def update_on_commit(table, season_code=None, keys=None, version=None, changed_at=None):
+    if version is None:
+        table_versions.reset()
+    else:
+        table_versions.update(table, season_code, version, changed_at)
+
+def build_etag(key, count, total):
+    return hashlib.sha1(f"{key}|{count}|{total}".encode()).hexdigest()[:20]
+
+def is_not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+def conditional(tables, season_arg="season_code", key_arg=None):
+    # Validators depend on the versions of the season from the URL or query string, or of the season
+    # of the gamecode named by key_arg for single-game routes, as in cached()
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            season_code = kwargs.get(season_arg) or request.args.get(season_arg)
+            if season_code is None and key_arg and kwargs.get(key_arg):
+                season_code = season_of_gamecode(kwargs[key_arg])
+            count, total, last_modified = table_versions.get(tables, season_code)
+
+            # Nothing recorded yet, or the replica may still be behind: serve without validators
+            tags = {(table, season_code, None) for table in tables}
+            if not count or response_cache.pending_versions(tags):
+                return view(*args, **kwargs)
+
+            etag = build_etag(cache_key(), count, total)
+            if is_not_modified(etag, last_modified):
+                response = Response(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+        return wrapper
+    return decorator
+
+def init_app(app):
+    if not app.config.get("CHANGE_FEED_ENABLED", True):
+        table_versions.max_age = app.config.get("VERSIONS_RELOAD_SECONDS", VERSIONS_RELOAD_SECONDS)
+    data_committed.connect(update_on_commit)
@@ -0,0 +1,54 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from flask.json.provider import JSONProvider
+from app.profiling import timing
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+# JSON provider for app.json (jsonify, request.get_json, exports)
+# Uses orjson when it is installed and the stdlib json module otherwise; both write compact output,
+# dates and datetimes as ISO 8601 and Decimals as floats, so responses are the same with either
+
+def json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, "tolist"):
+        # NumPy scalars and arrays
+        return value.tolist()
+    return str(value)
+
+class FastJSONProvider(JSONProvider):
+    mimetype = "application/json"
+
+    if orjson is not None:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+        def dumps_bytes(self, obj):
+            return orjson.dumps(obj, default=json_default, option=self.options)
+
+        def dumps(self, obj, **kwargs):
+            return self.dumps_bytes(obj).decode("utf-8")
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+    else:
+        def dumps_bytes(self, obj):
+            return self.dumps(obj).encode("utf-8")
+
+        def dumps(self, obj, **kwargs):
+            return json.dumps(obj, default=json_default, ensure_ascii=False, separators=(",", ":"))
+
+        def loads(self, s, **kwargs):
+            return json.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        with timing("serialize"):
+            body = self.dumps_bytes(obj) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,163 @@
+import logging
+import queue
+import threading
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.cache import season_of_gamecode
+from app.queries import GAME_BY_CODE, PLAY_BY_PLAY_SINCE
+from ingest.changes import data_committed
+
+# Live game updates for the Server-Sent Events stream (app/api/live.py)
+# One broadcaster per process keeps a channel for every game somebody is watching. When an ingest commit
+# of play_by_play or games is announced for a watched game (ingest/live_play_by_play.py during games,
+# relayed by app/change_feed.py), the broadcaster reads the new events and the score once, encodes them
+# once as SSE text and puts that same message on the queue of every subscriber of the game
+# A message is a list of (event, event id, text) parts; subscribers skip plays they already sent
+# A subscriber that falls SUBSCRIBER_QUEUE messages behind is dropped; its client reconnects with
+# Last-Event-ID and catches up from the database
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE = 100
+
+# Play type of the final event of a game (see ingest/live_play_by_play.py)
+END_OF_GAME = "EG"
+
+def sse_message(event, data, event_id=None):
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {data}")
+    return "\n".join(lines) + "\n\n"
+
+def play_part(dumps, event):
+    return ("play", event["play_number"], sse_message("play", dumps(event), event["play_number"]))
+
+def score_part(dumps, score):
+    return ("score", None, sse_message("score", dumps(score)))
+
+def end_part(dumps, gamecode):
+    return ("end", None, sse_message("end", dumps({"gamecode": gamecode})))
+
+def game_score(game):
+    return {"home_score": game["home_score"], "away_score": game["away_score"]}
+
+def is_finished(game, events):
+    return bool(game and game["played"]) or any(event["event_type"] == END_OF_GAME for event in events)
+
+class Subscriber:
+    def __init__(self):
+        self.messages = queue.Queue(SUBSCRIBER_QUEUE)
+        self.dropped = False
+
+class LiveChannel:
+    def __init__(self, gamecode):
+        self.gamecode = gamecode
+        self.season_code = season_of_gamecode(gamecode)
+        # Unknown until the first subscriber has read its backlog (see seed)
+        self.last_play_number = None
+        self.score = None
+        self.finished = False
+        self.subscribers = set()
+
+class LiveBroadcaster:
+    def __init__(self):
+        self.channels = {}
+        self.dumps = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, gamecode):
+        # Subscribe before reading the backlog: whatever is committed in between arrives twice at worst
+        subscriber = Subscriber()
+        with self._lock:
+            channel = self.channels.get(gamecode)
+            if channel is None:
+                channel = self.channels[gamecode] = LiveChannel(gamecode)
+            channel.subscribers.add(subscriber)
+        return subscriber
+
+    def seed(self, gamecode, last_play_number, score):
+        # The backlog of the first subscriber tells a new channel where the game stands
+        with self._lock:
+            channel = self.channels.get(gamecode)
+            if channel is not None and channel.last_play_number is None:
+                channel.last_play_number = last_play_number
+                channel.score = score
+
+    def unsubscribe(self, gamecode, subscriber):
+        with self._lock:
+            channel = self.channels.get(gamecode)
+            if channel is None:
+                return
+            channel.subscribers.discard(subscriber)
+            if not channel.subscribers:
+                del self.channels[gamecode]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "games": len(self.channels),
+                "subscribers": sum(len(channel.subscribers) for channel in self.channels.values())
+            }
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(channel.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.messages.put_nowait(message)
+            except queue.Full:
+                subscriber.dropped = True
+                self.unsubscribe(channel.gamecode, subscriber)
+
+    def refresh(self, gamecodes=None):
+        with self._lock:
+            channels = [
+                channel for gamecode, channel in self.channels.items()
+                if gamecodes is None or gamecode in gamecodes
+            ]
+        if not channels:
+            return
+
+        # The primary, not a replica: the commit that was just announced has to be visible already
+        with db.get_engine("write").connect() as conn:
+            for channel in channels:
+                message = self.read_updates(conn, channel)
+                if message:
+                    self.publish(channel, message)
+
+    def read_updates(self, conn, channel):
+        # A channel still waiting for its seed reads the whole game; subscribers drop the repeated plays
+        events = [dict(row) for row in conn.execute(PLAY_BY_PLAY_SINCE, {
+            "gamecode": channel.gamecode, "season_code": channel.season_code, "after": channel.last_play_number or 0
+        }).mappings()]
+        game = conn.execute(GAME_BY_CODE, {"gamecode": channel.gamecode}).mappings().first()
+
+        parts = [play_part(self.dumps, event) for event in events]
+        if events:
+            channel.last_play_number = events[-1]["play_number"]
+
+        if game is not None:
+            score = game_score(game)
+            if score != channel.score:
+                channel.score = score
+                parts.append(score_part(self.dumps, score))
+
+        if is_finished(game, events) and not channel.finished:
+            channel.finished = True
+            parts.append(end_part(self.dumps, channel.gamecode))
+        return parts
+
+live_broadcaster = LiveBroadcaster()
+
+def broadcast_on_commit(table, season_code=None, keys=None, version=None, changed_at=None):
+    if table not in ("play_by_play", "games") or not live_broadcaster.channels:
+        return
+    try:
+        live_broadcaster.refresh(set(keys) if keys else None)
+    except SQLAlchemyError:
+        logger.exception("Live update failed for %s", table)
+
+def init_app(app):
+    live_broadcaster.dumps = app.json.dumps
+    data_committed.connect(broadcast_on_commit)
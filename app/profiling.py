@@ -0,0 +1,153 @@
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+import psycopg2.extensions
+from flask import g, has_request_context, request
+
+# Per-request profiling
+# Every request records its total time, the time and number of its database queries, the response
+# cache outcome and the time spent serializing JSON. The figures go out in a Server-Timing header and
+# into per-endpoint latency histograms; requests slower than PROFILING_SLOW_MS keep their SQL as samples.
+# Both are served at /api/metrics
+
+DEFAULT_SLOW_MS = 500
+DEFAULT_MAX_SAMPLES = 50
+MAX_SAMPLE_STATEMENTS = 50
+
+# Upper bounds of the latency buckets in milliseconds; the last bucket is open-ended
+BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+class ProfilingCursor(psycopg2.extensions.cursor):
+    # cursor_factory of the pooled connections: times every statement, Core or raw psycopg2
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            record_query(self, time.perf_counter() - start)
+
+def record_query(cursor, seconds):
+    if not has_request_context() or "profile" not in g:
+        return
+    profile = g.profile
+    profile["db"] += seconds
+    profile["queries"] += 1
+    if len(profile["statements"]) < MAX_SAMPLE_STATEMENTS:
+        profile["statements"].append((cursor.query, seconds))
+
+@contextmanager
+def timing(name):
+    # Adds the duration of the block to a named timing of the current request
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if has_request_context() and "profile" in g:
+            g.profile["timings"][name] = g.profile["timings"].get(name, 0.0) + time.perf_counter() - start
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation (None when it falls in the open bucket)
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS + [None], self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": {f"le_{bound}": count for bound, count in zip(BUCKETS_MS, self.counts)} | {"inf": self.counts[-1]}
+        }
+
+class RequestMetrics:
+    def __init__(self, max_samples=DEFAULT_MAX_SAMPLES):
+        self.histograms = {}
+        self.slow_requests = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint, ms, sample=None):
+        with self._lock:
+            histogram = self.histograms.get(endpoint)
+            if histogram is None:
+                histogram = self.histograms[endpoint] = LatencyHistogram()
+            histogram.observe(ms)
+            if sample is not None:
+                self.slow_requests.append(sample)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "endpoints": {endpoint: histogram.to_dict() for endpoint, histogram in sorted(self.histograms.items())},
+                "slow_requests": list(self.slow_requests)
+            }
+
+request_metrics = RequestMetrics()
+
+def decode_statement(query):
+    return query.decode("utf-8", "replace") if isinstance(query, bytes) else str(query)
+
+def server_timing(profile, total_ms, cache_status):
+    entries = [f'db;dur={profile["db"] * 1000:.1f};desc="{profile["queries"]} queries"']
+    for name, seconds in profile["timings"].items():
+        entries.append(f"{name};dur={seconds * 1000:.1f}")
+    if cache_status:
+        entries.append(f'cache;desc="{cache_status}"')
+    entries.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(entries)
+
+def init_app(app):
+    slow_ms = app.config.get("PROFILING_SLOW_MS", DEFAULT_SLOW_MS)
+    request_metrics.slow_requests = deque(maxlen=app.config.get("PROFILING_MAX_SAMPLES", DEFAULT_MAX_SAMPLES))
+
+    @app.before_request
+    def start_profile():
+        g.profile = {"start": time.perf_counter(), "db": 0.0, "queries": 0, "statements": [], "timings": {}}
+
+    @app.after_request
+    def finish_profile(response):
+        # Registered before the other after_request hooks so it runs last and includes them;
+        # streamed responses are measured up to their first byte
+        profile = g.pop("profile", None)
+        if profile is None:
+            return response
+
+        total_ms = (time.perf_counter() - profile["start"]) * 1000
+        cache_status = response.headers.get("X-Cache")
+        response.headers["Server-Timing"] = server_timing(profile, total_ms, cache_status)
+
+        sample = None
+        if total_ms >= slow_ms:
+            sample = {
+                "endpoint": request.endpoint,
+                "path": request.full_path.rstrip("?"),
+                "status": response.status_code,
+                "total_ms": round(total_ms, 1),
+                "db_ms": round(profile["db"] * 1000, 1),
+                "queries": profile["queries"],
+                "cache": cache_status,
+                "sql": [
+                    {"statement": decode_statement(query), "ms": round(seconds * 1000, 1)}
+                    for query, seconds in profile["statements"]
+                ]
+            }
+        request_metrics.observe(request.endpoint or "unmatched", total_ms, sample)
+        return response
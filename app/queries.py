@@ -0,0 +1,262 @@
+from sqlalchemy import Text, and_, any_, bindparam, cast, column, func, or_, select, table, tuple_
+from app.db import get_connection
+
+# Reusable SQLAlchemy Core queries for the API
+# Statements are built once at import with bound parameters, so SQLAlchemy compiles each of them a single
+# time (compiled cache) and every request only binds values. Rows come back as plain dicts, no ORM objects
+
+def define_table(name, *columns):
+    return table(name, *(column(c) for c in columns))
+
+GAME_FIELDS = [
+    "gamecode", "season_code", "competition_code", "round_number", "phase_type", "group_name",
+    "date", "utc_date", "played", "home_team_code", "away_team_code",
+    "home_score", "away_score", "venue_code", "attendance", "local_timezone",
+    "game_number", "confirmed_date", "confirmed_hour", "is_neutral_venue",
+    "game_status", "winner_team_code"
+]
+
+PLAYER_GAME_STATS_FIELDS = [
+    "gamecode", "person_code", "team_code", "points", "minutes_played", "pir",
+    "field_goals_2_made", "field_goals_2_attempted", "field_goals_3_made", "field_goals_3_attempted",
+    "free_throws_made", "free_throws_attempted", "total_rebounds", "offensive_rebounds",
+    "defensive_rebounds", "assists", "steals", "turnovers", "blocks_favour", "blocks_against",
+    "fouls_committed", "fouls_received", "plus_minus", "start_five", "dorsal", "position",
+    "position_name", "starting_five"
+]
+
+TEAM_GAME_STATS_FIELDS = [
+    "gamecode", "team_code", "points", "valuation",
+    "field_goals_2_made", "field_goals_2_attempted", "field_goals_3_made", "field_goals_3_attempted",
+    "free_throws_made", "free_throws_attempted", "field_goals_total_made", "field_goals_total_attempted",
+    "total_rebounds", "defensive_rebounds", "offensive_rebounds", "assists", "steals", "turnovers",
+    "blocks_favour", "blocks_against", "fouls_committed", "fouls_received", "plus_minus", "time_played",
+    "points_q1", "points_q2", "points_q3", "points_q4", "extra_periods"
+]
+
+STANDINGS_FIELDS = [
+    "season_code", "round_number", "team_code", "position", "position_change", "games_played",
+    "games_won", "games_lost", "qualified", "group_name", "streaks"
+]
+
+PEOPLE_FIELDS = [
+    "person_code", "name", "alias", "passport_name", "passport_surname", "jersey_name",
+    "abbreviated_name", "country_code", "country_name", "height", "weight", "birth_date",
+    "birth_country_code", "birth_country_name", "twitter_account", "instagram_account",
+    "facebook_account", "is_referee", "image_url"
+]
+
+TEAM_FIELDS = [
+    "team_code", "name", "alias", "is_virtual", "country_code", "country_name", "city", "address",
+    "website", "tickets_url", "facebook_account", "twitter_account", "instagram_account", "crest_url",
+    "president", "phone", "fax", "national_competition_code"
+]
+
+PLAYER_SEASON_STATS_FIELDS = [
+    "season_code", "person_code", "phase_type", "team_code", "games_played", "games_started",
+    "minutes_played", "points", "pir", "field_goals_2_made", "field_goals_2_attempted",
+    "field_goals_3_made", "field_goals_3_attempted", "free_throws_made", "free_throws_attempted",
+    "total_rebounds", "offensive_rebounds", "defensive_rebounds", "assists", "steals", "turnovers",
+    "blocks", "blocks_against", "fouls_committed", "fouls_drawn", "plus_minus", "wins", "losses",
+    "double_doubles", "triple_doubles"
+]
+
+TEAM_SEASON_STATS_FIELDS = [
+    "season_code", "team_code", "games_played", "points", "valuation",
+    "field_goals_2_made", "field_goals_2_attempted", "field_goals_3_made", "field_goals_3_attempted",
+    "free_throws_made", "free_throws_attempted", "field_goals_total_made", "field_goals_total_attempted",
+    "total_rebounds", "defensive_rebounds", "offensive_rebounds", "assists", "steals", "turnovers",
+    "blocks_favour", "blocks_against", "fouls_committed", "fouls_received", "plus_minus", "time_played"
+]
+
+PLAY_BY_PLAY_FIELDS = [
+    "gamecode", "play_number", "team_code", "person_code", "period", "time_string",
+    "event_type", "description", "points_a", "points_b", "season_code"
+]
+
+games = define_table("games", *GAME_FIELDS)
+player_game_stats = define_table("player_game_stats", *PLAYER_GAME_STATS_FIELDS)
+team_game_stats = define_table("team_game_stats", *TEAM_GAME_STATS_FIELDS)
+standings = define_table("standings", *STANDINGS_FIELDS)
+people = define_table("people", *PEOPLE_FIELDS)
+teams = define_table("teams", *TEAM_FIELDS)
+player_season_stats = define_table("player_season_stats", *PLAYER_SEASON_STATS_FIELDS)
+team_season_stats = define_table("team_season_stats", *TEAM_SEASON_STATS_FIELDS)
+play_by_play = define_table("play_by_play_view", *PLAY_BY_PLAY_FIELDS)
+game_summaries = define_table("game_summaries", "gamecode", "season_code", "summary", "built_at")
+player_leaderboards = define_table(
+    "player_leaderboards",
+    "season_code", "phase_type", "stat", "person_code", "team_code", "games_played",
+    "minutes_played", "total", "per_game", "per_40"
+)
+
+GAME_BY_CODE = select(games).where(games.c.gamecode == bindparam("gamecode"))
+
+# The stored document is returned as JSON text and sent as is, never decoded in Python
+GAME_SUMMARY_BY_CODE = select(cast(game_summaries.c.summary, Text)).where(game_summaries.c.gamecode == bindparam("gamecode"))
+
+# season_code keeps the scan inside one partition of play_by_play
+PLAY_BY_PLAY_SINCE = (
+    select(play_by_play)
+    .where(play_by_play.c.season_code == bindparam("season_code"))
+    .where(play_by_play.c.gamecode == bindparam("gamecode"))
+    .where(play_by_play.c.play_number > bindparam("after"))
+    .order_by(play_by_play.c.play_number)
+)
+
+PLAYER_GAME_STATS_BY_GAME = (
+    select(player_game_stats, people.c.name)
+    .select_from(player_game_stats.outerjoin(people, people.c.person_code == player_game_stats.c.person_code))
+    .where(player_game_stats.c.gamecode == bindparam("gamecode"))
+    .order_by(player_game_stats.c.team_code, player_game_stats.c.starting_five.desc().nulls_last(),
+              player_game_stats.c.dorsal)
+)
+
+TEAM_GAME_STATS_BY_GAME = (
+    select(team_game_stats, teams.c.name)
+    .select_from(team_game_stats.outerjoin(teams, teams.c.team_code == team_game_stats.c.team_code))
+    .where(team_game_stats.c.gamecode == bindparam("gamecode"))
+    .order_by(team_game_stats.c.team_code)
+)
+
+LATEST_STANDINGS_ROUND = (
+    select(func.max(standings.c.round_number))
+    .where(standings.c.season_code == bindparam("season_code"))
+    .scalar_subquery()
+)
+
+STANDINGS_BY_ROUND = (
+    select(standings, teams.c.name)
+    .select_from(standings.outerjoin(teams, teams.c.team_code == standings.c.team_code))
+    .where(standings.c.season_code == bindparam("season_code"))
+    .where(standings.c.round_number == func.coalesce(bindparam("round_number"), LATEST_STANDINGS_ROUND))
+    .order_by(standings.c.group_name, standings.c.position)
+)
+
+PLAYER_SEASON_STATS_BY_SEASON = (
+    select(player_season_stats, people.c.name)
+    .select_from(player_season_stats.outerjoin(people, people.c.person_code == player_season_stats.c.person_code))
+    .where(player_season_stats.c.season_code == bindparam("season_code"))
+    .where(player_season_stats.c.phase_type == bindparam("phase_type"))
+    .order_by(player_season_stats.c.team_code, player_season_stats.c.person_code)
+)
+
+TEAM_SEASON_STATS_BY_SEASON = (
+    select(team_season_stats, teams.c.name)
+    .select_from(team_season_stats.outerjoin(teams, teams.c.team_code == team_season_stats.c.team_code))
+    .where(team_season_stats.c.season_code == bindparam("season_code"))
+    .order_by(team_season_stats.c.team_code)
+)
+
+PERSON_BY_CODE = select(people).where(people.c.person_code == bindparam("person_code"))
+
+# Batch lookups: one primary-key probe per code inside a single `= ANY(%(codes)s)` query
+PEOPLE_BY_CODES = select(people).where(people.c.person_code == any_(bindparam("codes")))
+TEAMS_BY_CODES = select(teams).where(teams.c.team_code == any_(bindparam("codes")))
+GAMES_BY_CODES = select(games).where(games.c.gamecode == any_(bindparam("codes")))
+
+# per parameter -> ordering that matches an index of player_leaderboards
+LEADER_ORDERINGS = {
+    "total": (player_leaderboards.c.total.desc(),),
+    "game": (player_leaderboards.c.per_game.desc(),),
+    "40": (player_leaderboards.c.per_40.desc().nulls_last(),)
+}
+
+LEADERS = {
+    per: (
+        select(
+            player_leaderboards.c.person_code, people.c.name, player_leaderboards.c.team_code,
+            player_leaderboards.c.games_played, player_leaderboards.c.minutes_played.label("seconds_played"),
+            player_leaderboards.c.total, player_leaderboards.c.per_game, player_leaderboards.c.per_40
+        )
+        .select_from(player_leaderboards.outerjoin(people, people.c.person_code == player_leaderboards.c.person_code))
+        .where(player_leaderboards.c.season_code == bindparam("season_code"))
+        .where(player_leaderboards.c.phase_type == bindparam("phase_type"))
+        .where(player_leaderboards.c.stat == bindparam("stat"))
+        .where(player_leaderboards.c.games_played >= bindparam("min_games"))
+        .order_by(*ordering, player_leaderboards.c.person_code)
+        .limit(bindparam("limit"))
+    )
+    for per, ordering in LEADER_ORDERINGS.items()
+}
+
+def fetch_all(statement, **params):
+    return [dict(row) for row in get_connection().execute(statement, params).mappings()]
+
+def fetch_one(statement, **params):
+    row = get_connection().execute(statement, params).mappings().first()
+    return dict(row) if row is not None else None
+
+def get_game(gamecode):
+    return fetch_one(GAME_BY_CODE, gamecode=gamecode)
+
+def get_game_summary(gamecode):
+    return get_connection().execute(GAME_SUMMARY_BY_CODE, {"gamecode": gamecode}).scalar()
+
+def get_play_by_play_since(gamecode, season_code, after=0):
+    return fetch_all(PLAY_BY_PLAY_SINCE, gamecode=gamecode, season_code=season_code, after=after)
+
+def get_player_game_stats(gamecode):
+    return fetch_all(PLAYER_GAME_STATS_BY_GAME, gamecode=gamecode)
+
+def get_team_game_stats(gamecode):
+    return fetch_all(TEAM_GAME_STATS_BY_GAME, gamecode=gamecode)
+
+def get_standings(season_code, round_number=None):
+    return fetch_all(STANDINGS_BY_ROUND, season_code=season_code, round_number=round_number)
+
+def get_player_season_stats(season_code, phase_type):
+    return fetch_all(PLAYER_SEASON_STATS_BY_SEASON, season_code=season_code, phase_type=phase_type)
+
+def get_team_season_stats(season_code):
+    return fetch_all(TEAM_SEASON_STATS_BY_SEASON, season_code=season_code)
+
+def get_person(person_code):
+    return fetch_one(PERSON_BY_CODE, person_code=person_code)
+
+def get_people(codes):
+    return fetch_all(PEOPLE_BY_CODES, codes=list(codes))
+
+def get_teams(codes):
+    return fetch_all(TEAMS_BY_CODES, codes=list(codes))
+
+def get_games(codes):
+    return fetch_all(GAMES_BY_CODES, codes=list(codes))
+
+def get_leaders(season_code, phase_type, stat, per, min_games, limit):
+    return fetch_all(
+        LEADERS[per],
+        season_code=season_code, phase_type=phase_type, stat=stat, min_games=min_games, limit=limit
+    )
+
+def get_games_page(fields, limit, season_code=None, round_number=None, team=None, played=None, after=None):
+    # Keyset page ordered by (utc_date, gamecode); the filters vary per request, so this statement is
+    # composed per call, and SQLAlchemy still caches its compiled form per combination of filters
+    columns = list(dict.fromkeys(fields + ["utc_date", "gamecode"]))
+    conditions = [games.c.utc_date.isnot(None)]
+    # One extra row tells whether another page exists
+    params = {"limit": limit + 1}
+
+    if season_code:
+        conditions.append(games.c.season_code == bindparam("season_code"))
+        params["season_code"] = season_code
+    if round_number is not None:
+        conditions.append(games.c.round_number == bindparam("round_number"))
+        params["round_number"] = round_number
+    if team:
+        conditions.append(or_(games.c.home_team_code == bindparam("team"), games.c.away_team_code == bindparam("team")))
+        params["team"] = team
+    if played is not None:
+        conditions.append(games.c.played == bindparam("played"))
+        params["played"] = played
+    if after:
+        conditions.append(tuple_(games.c.utc_date, games.c.gamecode) > tuple_(bindparam("after_date"), bindparam("after_code")))
+        params["after_date"], params["after_code"] = after
+
+    statement = (
+        select(*(games.c[name] for name in columns))
+        .where(and_(*conditions))
+        .order_by(games.c.utc_date, games.c.gamecode)
+        .limit(bindparam("limit"))
+    )
+    return fetch_all(statement, **params)
@@ -0,0 +1,217 @@
+import bisect
+import heapq
+import logging
+import threading
+import unicodedata
+from sqlalchemy import any_, bindparam, select
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.queries import people, teams
+from ingest.changes import data_committed
+
+# In-memory autocomplete over people and teams
+# Names are normalized (accents stripped, case folded, punctuation as spaces) and indexed twice:
+#   - a sorted (token, key) list, where every token starting with a prefix is one bisect range away
+#   - trigram postings, used as a typo-tolerant fallback when no prefix matches
+# The index is built at startup and updated in place for the codes an ingest stage reports as changed
+
+logger = logging.getLogger(__name__)
+
+MIN_SIMILARITY = 0.3
+
+PEOPLE_SEARCH = select(
+    people.c.person_code, people.c.name, people.c.alias, people.c.jersey_name,
+    people.c.passport_name, people.c.passport_surname, people.c.image_url
+)
+TEAMS_SEARCH = select(teams.c.team_code, teams.c.name, teams.c.alias, teams.c.crest_url)
+
+def normalize(text):
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join("".join(char if char.isalnum() else " " for char in stripped.casefold()).split())
+
+def trigrams(text):
+    grams = set()
+    for token in text.split():
+        padded = f"  {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def person_entry(row):
+    passport = " ".join(part for part in (row["passport_name"], row["passport_surname"]) if part)
+    return {
+        "type": "person",
+        "code": row["person_code"],
+        "name": row["name"],
+        "image_url": row["image_url"],
+        "search": [row["name"], row["alias"], row["jersey_name"], passport]
+    }
+
+def team_entry(row):
+    return {
+        "type": "team",
+        "code": row["team_code"],
+        "name": row["name"],
+        "image_url": row["crest_url"],
+        "search": [row["name"], row["alias"], row["team_code"]]
+    }
+
+class SearchIndex:
+    def __init__(self):
+        self.ready = False
+        self._entries = {}
+        self._tokens = []
+        self._trigrams = {}
+        self._lock = threading.RLock()
+
+    def build(self, entries):
+        # Built aside and swapped in, so searches keep answering from the old index meanwhile
+        fresh = SearchIndex()
+        for entry in entries:
+            fresh._add(entry, sort=False)
+        fresh._tokens.sort()
+
+        with self._lock:
+            self._entries, self._tokens, self._trigrams = fresh._entries, fresh._tokens, fresh._trigrams
+            self.ready = True
+
+    def update(self, entries):
+        with self._lock:
+            for entry in entries:
+                self._add(entry, sort=True)
+
+    def _add(self, entry, sort):
+        key = (entry["type"], entry["code"])
+        if key in self._entries:
+            self._remove(key)
+
+        strings = list(dict.fromkeys(normalize(value) for value in entry.pop("search") if value))
+        string_grams = [trigrams(string) for string in strings]
+        grams = set().union(*string_grams)
+        tokens = {token for string in strings for token in string.split()}
+        self._entries[key] = {
+            "result": entry, "strings": strings, "tokens": tokens, "string_grams": string_grams, "trigrams": grams
+        }
+
+        for token in tokens:
+            if sort:
+                bisect.insort(self._tokens, (token, key))
+            else:
+                self._tokens.append((token, key))
+        for gram in grams:
+            self._trigrams.setdefault(gram, set()).add(key)
+
+    def _remove(self, key):
+        indexed = self._entries.pop(key)
+        for token in indexed["tokens"]:
+            position = bisect.bisect_left(self._tokens, (token, key))
+            if position < len(self._tokens) and self._tokens[position] == (token, key):
+                del self._tokens[position]
+        for gram in indexed["trigrams"]:
+            self._trigrams[gram].discard(key)
+
+    def _prefix_keys(self, prefix):
+        keys = set()
+        position = bisect.bisect_left(self._tokens, (prefix,))
+        while position < len(self._tokens) and self._tokens[position][0].startswith(prefix):
+            keys.add(self._tokens[position][1])
+            position += 1
+        return keys
+
+    def _rank(self, key, query, similarity):
+        indexed = self._entries[key]
+        if query in indexed["strings"]:
+            match = 0
+        elif any(string.startswith(query) for string in indexed["strings"]):
+            match = 1
+        elif similarity is None:
+            match = 2
+        else:
+            match = 3
+        name = indexed["result"]["name"] or ""
+        return (match, -(similarity or 0), len(name), name)
+
+    def search(self, text, limit=10, kind=None):
+        query = normalize(text)
+        if not query:
+            return []
+
+        with self._lock:
+            # Every query token has to prefix some token of the entry: the longest (most selective)
+            # token is looked up in the index and the rest are checked on its matches
+            first, *rest = sorted(query.split(), key=len, reverse=True)
+            ranked = {}
+            for key in self._prefix_keys(first):
+                if kind and key[0] != kind:
+                    continue
+                tokens = self._entries[key]["tokens"]
+                if all(any(token.startswith(prefix) for token in tokens) for prefix in rest):
+                    ranked[key] = None
+
+            # Typo fallback: nothing starts with the query, so rank by trigram similarity
+            # against the closest searchable string of each entry sharing enough trigrams
+            if not ranked and len(query) >= 3:
+                query_grams = trigrams(query)
+                shared = {}
+                for gram in query_grams:
+                    for key in self._trigrams.get(gram, ()):
+                        shared[key] = shared.get(key, 0) + 1
+                needed = MIN_SIMILARITY * len(query_grams)
+                for key, count in shared.items():
+                    if count < needed or (kind and key[0] != kind):
+                        continue
+                    similarity = max(
+                        len(query_grams & grams) / len(query_grams | grams)
+                        for grams in self._entries[key]["string_grams"]
+                    )
+                    if similarity >= MIN_SIMILARITY:
+                        ranked[key] = similarity
+
+            best = heapq.nsmallest(limit, ranked, key=lambda key: self._rank(key, query, ranked[key]))
+            return [self._entries[key]["result"] for key in best]
+
+search_index = SearchIndex()
+
+def load_entries(codes=None, tables=("people", "teams")):
+    # Runs outside requests (startup, change notifications), so it checks out its own connection
+    statements = {
+        "people": (PEOPLE_SEARCH, people.c.person_code, person_entry),
+        "teams": (TEAMS_SEARCH, teams.c.team_code, team_entry)
+    }
+    entries = []
+    with db.get_engine("read").connect() as conn:
+        for table in tables:
+            statement, key, build_entry = statements[table]
+            if codes is not None:
+                statement = statement.where(key == any_(bindparam("codes")))
+            rows = conn.execute(statement, {"codes": list(codes or [])}).mappings()
+            entries.extend(build_entry(row) for row in rows)
+    return entries
+
+def build_index():
+    search_index.build(load_entries())
+
+def ensure_index():
+    if not search_index.ready:
+        build_index()
+
+def refresh_on_commit(table, season_code=None, keys=None, version=None, changed_at=None):
+    if table not in ("people", "teams"):
+        return
+    try:
+        if not search_index.ready:
+            return
+        if keys:
+            search_index.update(load_entries(codes=keys, tables=(table,)))
+        else:
+            search_index.build(load_entries())
+    except SQLAlchemyError:
+        logger.exception("Search index refresh failed for %s", table)
+
+def init_app(app):
+    data_committed.connect(refresh_on_commit)
+    # Built eagerly when the database is reachable, otherwise on the first search
+    try:
+        build_index()
+    except SQLAlchemyError:
+        logger.warning("Search index not built at startup, database unavailable")
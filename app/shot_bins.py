@@ -0,0 +1,136 @@
+import threading
+import numpy as np
+from ingest.changes import data_committed
+from app.shots import FLAG_FREE_THROW, fetch_shot_columns, get_zone_names
+
+# Shot chart aggregation with NumPy
+# Field-goal attempts (free throws excluded) are binned on a square grid or a pointy-top hexagonal grid
+# and summarized per court zone, each bin and zone carrying the league FG% of the same season as baseline
+# League baselines are kept per (season, bin mode, bin size) until shot_data changes for that season
+
+SQRT3 = np.sqrt(3.0)
+
+_baselines = {}
+_baselines_lock = threading.Lock()
+
+def field_goals(columns):
+    keep = (columns["flags"] & FLAG_FREE_THROW) == 0
+    x = columns["coord_x"][keep].astype(np.float64)
+    y = columns["coord_y"][keep].astype(np.float64)
+    made = columns["points"][keep] > 0
+    zone = columns["zone"][keep]
+    return x, y, made, zone
+
+def grid_cells(x, y, size):
+    cells = np.stack([np.floor(x / size), np.floor(y / size)], axis=1).astype(np.int64)
+    return cells, lambda c: ((c[:, 0] + 0.5) * size, (c[:, 1] + 0.5) * size)
+
+def hex_cells(x, y, size):
+    # Axial coordinates of pointy-top hexagons with circumradius `size`, rounded through cube coordinates
+    q = (SQRT3 / 3 * x - y / 3) / size
+    r = (2 / 3 * y) / size
+    s = -q - r
+
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+
+    cells = np.stack([rq, rr], axis=1).astype(np.int64)
+    return cells, lambda c: (size * SQRT3 * (c[:, 0] + c[:, 1] / 2), size * 1.5 * c[:, 1])
+
+BINNERS = {
+    "grid": grid_cells,
+    "hex": hex_cells
+}
+
+def count_bins(cells, made):
+    if len(cells) == 0:
+        return np.empty((0, 2), dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    unique_cells, inverse = np.unique(cells, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    attempts = np.bincount(inverse, minlength=len(unique_cells))
+    makes = np.bincount(inverse, weights=made, minlength=len(unique_cells)).astype(np.int64)
+    return unique_cells, attempts, makes
+
+def count_zones(zone, made):
+    attempts = np.bincount(zone, minlength=256)
+    makes = np.bincount(zone, weights=made, minlength=256).astype(np.int64)
+    return attempts, makes
+
+def fg_pct(makes, attempts):
+    return round(float(makes) / float(attempts), 4) if attempts else None
+
+def league_baseline(season_code, mode, size):
+    key = (season_code, mode, size)
+    with _baselines_lock:
+        baseline = _baselines.get(key)
+    if baseline is not None:
+        return baseline
+
+    x, y, made, zone = field_goals(fetch_shot_columns(season_code))
+    cells, _ = BINNERS[mode](x, y, size)
+    unique_cells, attempts, makes = count_bins(cells, made)
+    zone_attempts, zone_makes = count_zones(zone, made)
+
+    baseline = {
+        "bins": {tuple(cell): (a, m) for cell, a, m in zip(unique_cells.tolist(), attempts, makes)},
+        "zone_attempts": zone_attempts,
+        "zone_makes": zone_makes
+    }
+    with _baselines_lock:
+        _baselines[key] = baseline
+    return baseline
+
+def aggregate_shots(season_code, mode="hex", size=50, team_code=None, person_code=None):
+    x, y, made, zone = field_goals(fetch_shot_columns(season_code, team_code, person_code))
+    cells, centers = BINNERS[mode](x, y, size)
+    unique_cells, attempts, makes = count_bins(cells, made)
+    center_x, center_y = centers(unique_cells)
+
+    baseline = league_baseline(season_code, mode, size)
+
+    bins = []
+    for cell, cx, cy, a, m in zip(unique_cells.tolist(), center_x.tolist(), center_y.tolist(), attempts, makes):
+        league_attempts, league_makes = baseline["bins"].get(tuple(cell), (0, 0))
+        bins.append({
+            "x": round(cx, 1),
+            "y": round(cy, 1),
+            "attempts": int(a),
+            "made": int(m),
+            "fg_pct": fg_pct(m, a),
+            "league_fg_pct": fg_pct(league_makes, league_attempts)
+        })
+
+    zone_names = get_zone_names()
+    zone_attempts, zone_makes = count_zones(zone, made)
+    zones = []
+    for zone_id in np.nonzero(zone_attempts)[0].tolist():
+        zones.append({
+            "zone": zone_names.get(zone_id),
+            "attempts": int(zone_attempts[zone_id]),
+            "made": int(zone_makes[zone_id]),
+            "fg_pct": fg_pct(zone_makes[zone_id], zone_attempts[zone_id]),
+            "league_fg_pct": fg_pct(baseline["zone_makes"][zone_id], baseline["zone_attempts"][zone_id])
+        })
+
+    return {
+        "attempts": int(len(made)),
+        "made": int(made.sum()),
+        "bins": bins,
+        "zones": zones
+    }
+
+def forget_baselines(table, season_code=None, keys=None, version=None, changed_at=None):
+    if table != "shot_data":
+        return
+    with _baselines_lock:
+        for key in list(_baselines):
+            if season_code is None or key[0] == season_code:
+                del _baselines[key]
+
+data_committed.connect(forget_baselines)
@@ -0,0 +1,60 @@
+import numpy as np
+from app.db import get_db
+
+# Column-wise shot data for shot charts
+# Postgres packs each column of the filtered shots into one bytea (int2send is big-endian int16,
+# set_byte a single uint8), so the rows never become Python objects; NumPy reads the buffers as arrays
+
+FLAG_FASTBREAK = 1
+FLAG_SECOND_CHANCE = 2
+FLAG_POINTS_OFF_TURNOVER = 4
+FLAG_FREE_THROW = 8
+
+SHOT_COLUMNS_QUERY = """
+    SELECT
+        COUNT(*),
+        COALESCE(string_agg(int2send(s.coord_x::int2), ''::bytea ORDER BY s.gamecode, s.play_number), ''::bytea),
+        COALESCE(string_agg(int2send(s.coord_y::int2), ''::bytea ORDER BY s.gamecode, s.play_number), ''::bytea),
+        COALESCE(string_agg(set_byte('\\x00'::bytea, 0, COALESCE(s.points_scored, 0)), ''::bytea ORDER BY s.gamecode, s.play_number), ''::bytea),
+        COALESCE(string_agg(set_byte('\\x00'::bytea, 0, COALESCE(s.zone_id, 0)), ''::bytea ORDER BY s.gamecode, s.play_number), ''::bytea),
+        COALESCE(string_agg(set_byte('\\x00'::bytea, 0,
+            COALESCE(s.fastbreak::int, 0) * 1
+            + COALESCE(s.second_chance::int, 0) * 2
+            + COALESCE(s.points_off_turnover::int, 0) * 4
+            + COALESCE((t.name LIKE 'FT%%')::int, 0) * 8
+        ), ''::bytea ORDER BY s.gamecode, s.play_number), ''::bytea)
+    FROM shot_data s
+    LEFT JOIN event_types t ON t.event_type_id = s.event_type_id
+    WHERE s.season_code = %s
+      AND s.coord_x IS NOT NULL
+      AND s.coord_y IS NOT NULL
+      {filters}
+"""
+
+def fetch_shot_columns(season_code, team_code=None, person_code=None):
+    filters = []
+    params = [season_code]
+    if team_code:
+        filters.append("AND s.team_code = %s")
+        params.append(team_code)
+    if person_code:
+        filters.append("AND s.person_code = %s")
+        params.append(person_code)
+
+    with get_db().cursor() as cur:
+        cur.execute(SHOT_COLUMNS_QUERY.format(filters=" ".join(filters)), params)
+        count, coord_x, coord_y, points, zones, flags = cur.fetchone()
+
+    return {
+        "count": count,
+        "coord_x": np.frombuffer(coord_x, dtype=">i2").astype("<i2"),
+        "coord_y": np.frombuffer(coord_y, dtype=">i2").astype("<i2"),
+        "points": np.frombuffer(points, dtype=np.uint8),
+        "zone": np.frombuffer(zones, dtype=np.uint8),
+        "flags": np.frombuffer(flags, dtype=np.uint8)
+    }
+
+def get_zone_names():
+    with get_db().cursor() as cur:
+        cur.execute("SELECT zone_id, name FROM shot_zones ORDER BY zone_id")
+        return dict(cur.fetchall())
@@ -0,0 +1,209 @@
+import contextlib
+import gzip
+import logging
+import os
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+import click
+from flask import Response, request, send_file
+from sqlalchemy import and_, any_, bindparam, distinct, exists, func, not_, select
+from app import db
+from app.api.leaders import LEADER_ORDERINGS, STATS
+from app.queries import define_table, games, standings
+from ingest.changes import data_committed
+from ingest.config import COMPETITION
+
+# Static JSON snapshots of finished seasons
+# `flask --app app build-snapshots` renders the API responses of completed seasons (games pages, game
+# details, box scores, summaries, standings per round, leaders, season stats) through the app itself and
+# stores them gzip-compressed under app/static/snapshots, one file per request:
+#     app/static/snapshots/<request path>/<sorted query string or "index">.json.gz
+# Requests with a snapshot are answered from the file before any view runs, so they never reach the
+# database; the layout also lets a front proxy serve them directly (try_files + gzip_static)
+# A change published for a snapshotted season deletes that season's files (rebuild to restore them); after
+# a change feed reconnect, seasons changed since their snapshots were built are deleted as well
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), "static", "snapshots")
+MANIFEST_DIR = os.path.join(SNAPSHOT_DIR, "_seasons")
+SNAPSHOT_MAX_AGE = 24 * 60 * 60
+
+seasons = define_table("seasons", "season_code", "competition_code", "end_date")
+data_versions = define_table("data_versions", "table_name", "season_code", "version", "changed_at")
+
+def snapshot_file(path, args):
+    query = urlencode(sorted(args)) or "index"
+    return os.path.join(SNAPSHOT_DIR, path.strip("/"), f"{query}.json.gz")
+
+def manifest_file(season_code):
+    return os.path.join(MANIFEST_DIR, f"{season_code}.txt")
+
+# ----------------------
+# Serving
+# ----------------------
+def serve_snapshot():
+    if request.method != "GET" or request.blueprint != "api":
+        return None
+
+    file_name = snapshot_file(request.path, request.args.items(multi=True))
+    if not os.path.isfile(file_name):
+        return None
+
+    if "gzip" in request.accept_encodings:
+        response = send_file(file_name, mimetype="application/json", conditional=True, max_age=SNAPSHOT_MAX_AGE)
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        with gzip.open(file_name, "rb") as snapshot:
+            response = Response(snapshot.read(), mimetype="application/json")
+        response.cache_control.public = True
+        response.cache_control.max_age = SNAPSHOT_MAX_AGE
+    response.vary.add("Accept-Encoding")
+    response.headers["X-Snapshot"] = "HIT"
+    return response
+
+# ----------------------
+# Building
+# ----------------------
+def completed_seasons():
+    # Ended, and no game left unplayed
+    unplayed = exists().where(and_(games.c.season_code == seasons.c.season_code, not_(games.c.played)))
+    statement = (
+        select(seasons.c.season_code)
+        .where(seasons.c.competition_code == COMPETITION)
+        .where(seasons.c.end_date < func.now())
+        .where(~unplayed)
+        .order_by(seasons.c.season_code)
+    )
+    with db.get_engine("read").connect() as conn:
+        return list(conn.execute(statement).scalars())
+
+def standings_rounds(season_code):
+    statement = (
+        select(distinct(standings.c.round_number))
+        .where(standings.c.season_code == season_code)
+        .order_by(standings.c.round_number)
+    )
+    with db.get_engine("read").connect() as conn:
+        return list(conn.execute(statement).scalars())
+
+class SnapshotWriter:
+    def __init__(self, client, season_code):
+        self.client = client
+        self.season_code = season_code
+        self.files = []
+
+    def render(self, path, **args):
+        # Returns the decoded body, or None when the API has nothing to store for this request
+        response = self.client.get(path, query_string=args, headers={"Accept-Encoding": "identity"})
+        if response.status_code != 200:
+            return None
+
+        file_name = snapshot_file(path, [(name, str(value)) for name, value in args.items()])
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+        with gzip.open(file_name, "wb", compresslevel=9) as snapshot:
+            snapshot.write(response.get_data())
+        self.files.append(os.path.relpath(file_name, SNAPSHOT_DIR))
+        return response.get_json()
+
+    def write_manifest(self):
+        os.makedirs(MANIFEST_DIR, exist_ok=True)
+        with open(manifest_file(self.season_code), "w") as manifest:
+            manifest.write("\n".join(self.files))
+
+def build_season(app, season_code):
+    discard_season(season_code)
+    writer = SnapshotWriter(app.test_client(), season_code)
+
+    # Games pages exactly as a client walks them: default page size, following next_cursor
+    gamecodes = []
+    args = {"season_code": season_code}
+    while True:
+        page = writer.render("/api/games", **args)
+        if page is None:
+            break
+        gamecodes.extend(game["gamecode"] for game in page["data"])
+        if not page["next_cursor"]:
+            break
+        args = {"season_code": season_code, "cursor": page["next_cursor"]}
+
+    for gamecode in gamecodes:
+        writer.render(f"/api/games/{gamecode}")
+        writer.render(f"/api/games/{gamecode}/boxscore")
+        writer.render(f"/api/games/{gamecode}/summary")
+
+    writer.render(f"/api/seasons/{season_code}/standings")
+    for round_number in standings_rounds(season_code):
+        writer.render(f"/api/seasons/{season_code}/standings", round_number=round_number)
+
+    for stat in STATS:
+        for per in LEADER_ORDERINGS:
+            writer.render("/api/leaders", season_code=season_code, stat=stat, per=per)
+    writer.render("/api/leaders", season_code=season_code)
+
+    writer.render(f"/api/seasons/{season_code}/stats/players")
+    writer.render(f"/api/seasons/{season_code}/stats/teams")
+
+    writer.write_manifest()
+    return len(writer.files)
+
+def discard_season(season_code):
+    # Every API worker gets the same notification and runs this at the same time: whoever comes second
+    # finds files (or the manifest) already gone
+    try:
+        with open(manifest_file(season_code)) as files:
+            relative_names = files.read().split("\n")
+    except FileNotFoundError:
+        return
+    for relative_name in relative_names:
+        if relative_name:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(SNAPSHOT_DIR, relative_name))
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(manifest_file(season_code))
+
+def snapshotted_seasons():
+    if not os.path.isdir(MANIFEST_DIR):
+        return []
+    return [name[:-len(".txt")] for name in os.listdir(MANIFEST_DIR) if name.endswith(".txt")]
+
+def discard_changed_seasons():
+    # For when change notifications may have been missed (change feed reconnect): discards the seasons
+    # with a data version newer than their snapshots
+    season_codes = snapshotted_seasons()
+    if not season_codes:
+        return
+    statement = (
+        select(data_versions.c.season_code, func.max(data_versions.c.changed_at))
+        .where(data_versions.c.season_code == any_(bindparam("season_codes")))
+        .group_by(data_versions.c.season_code)
+    )
+    with db.get_engine("read").connect() as conn:
+        changed = dict(conn.execute(statement, {"season_codes": season_codes}).all())
+
+    for season_code in season_codes:
+        try:
+            built_at = datetime.fromtimestamp(os.path.getmtime(manifest_file(season_code)), timezone.utc)
+        except FileNotFoundError:
+            continue
+        if changed.get(season_code) and changed[season_code] > built_at:
+            discard_season(season_code)
+            logger.info("Snapshots of %s discarded, changed after they were built", season_code)
+
+def discard_on_commit(table, season_code=None, keys=None, version=None, changed_at=None):
+    # Changes without season (new people or teams) leave finished seasons as rendered
+    if season_code and os.path.isfile(manifest_file(season_code)):
+        discard_season(season_code)
+        logger.info("Snapshots of %s discarded after a change of %s", season_code, table)
+
+def init_app(app):
+    app.before_request(serve_snapshot)
+    data_committed.connect(discard_on_commit)
+
+    @app.cli.command("build-snapshots")
+    @click.option("--season", "season_codes", multiple=True, help="Season code to render (default: every completed season)")
+    def build_snapshots(season_codes):
+        """Render the API responses of completed seasons into app/static/snapshots."""
+        for season_code in season_codes or completed_seasons():
+            count = build_season(app, season_code)
+            click.echo(f"{season_code}: {count} snapshots")
@@ -0,0 +1,89 @@
+import psycopg2
+from config import DB_CONFIG, GAMECODES, SEASONS, COMPETITION
+from changes import publish_change
+
+# Build the game_summaries documents of the ingested seasons (ingest/migrations/0009_game_summaries.sql)
+# Each season is one INSERT ... SELECT that assembles every played game's document in Postgres
+# Documents identical to the stored ones are skipped, so only games whose data changed are rewritten
+# and reported to the API
+
+BUILD_SUMMARIES_QUERY = """
+    INSERT INTO game_summaries (gamecode, season_code, summary)
+    SELECT
+        g.gamecode,
+        g.season_code,
+        jsonb_build_object(
+            'game', to_jsonb(g) || jsonb_build_object(
+                'home_team_name', home.name,
+                'away_team_name', away.name
+            ),
+            'venue', (
+                SELECT jsonb_build_object('venue_code', v.venue_code, 'name', v.name, 'capacity', v.capacity, 'address', v.address)
+                FROM venues v
+                WHERE v.venue_code = g.venue_code
+            ),
+            'teams', (
+                SELECT COALESCE(jsonb_agg(
+                    to_jsonb(t) || jsonb_build_object('name', tm.name, 'crest_url', tm.crest_url)
+                    ORDER BY t.team_code
+                ), '[]'::jsonb)
+                FROM team_game_stats t
+                LEFT JOIN teams tm ON tm.team_code = t.team_code
+                WHERE t.gamecode = g.gamecode
+            ),
+            'players', (
+                SELECT COALESCE(jsonb_agg(
+                    to_jsonb(p) || jsonb_build_object('name', pe.name, 'image_url', pe.image_url)
+                    ORDER BY p.team_code, p.starting_five DESC NULLS LAST, p.dorsal
+                ), '[]'::jsonb)
+                FROM player_game_stats p
+                LEFT JOIN people pe ON pe.person_code = p.person_code
+                WHERE p.gamecode = g.gamecode
+            ),
+            'referees', (
+                SELECT COALESCE(jsonb_agg(
+                    jsonb_build_object('person_code', r.person_code, 'name', pe.name, 'role', r.role)
+                    ORDER BY r.role, r.person_code
+                ), '[]'::jsonb)
+                FROM game_referees r
+                LEFT JOIN people pe ON pe.person_code = r.person_code
+                WHERE r.gamecode = g.gamecode
+            )
+        )
+    FROM games g
+    LEFT JOIN teams home ON home.team_code = g.home_team_code
+    LEFT JOIN teams away ON away.team_code = g.away_team_code
+    WHERE g.season_code = %s
+      AND g.played
+      AND (%s::text[] IS NULL OR g.gamecode = ANY(%s))
+    ON CONFLICT (gamecode) DO UPDATE SET
+        season_code = EXCLUDED.season_code,
+        summary = EXCLUDED.summary,
+        built_at = now()
+    WHERE game_summaries.summary IS DISTINCT FROM EXCLUDED.summary
+    RETURNING gamecode;
+"""
+
+def build_game_summaries():
+    conn = psycopg2.connect(**DB_CONFIG)
+
+    with conn.cursor() as cur:
+        for season in SEASONS:
+            season_code = f"{COMPETITION}{season}"
+            try:
+                cur.execute(BUILD_SUMMARIES_QUERY, (season_code, GAMECODES, GAMECODES))
+                gamecodes = [gamecode for (gamecode,) in cur.fetchall()]
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Error building summaries for {season_code}: {e}")
+                continue
+
+            if gamecodes:
+                publish_change(cur, "game_summaries", season_code, gamecodes)
+            print(f"{season_code}: {len(gamecodes)} game summaries rebuilt")
+
+    conn.close()
+
+if __name__ == "__main__":
+    build_game_summaries()
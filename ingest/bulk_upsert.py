@@ -0,0 +1,134 @@
+# bulk_upsert.py
+
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+
+# Declarative multi-row upserts for the ingest stages
+# A table spec lists the columns, the conflict key and how each non-key column is updated
+# when the row already exists:
+#   "overwrite" -> column = EXCLUDED.column
+#   "coalesce"  -> column = COALESCE(EXCLUDED.column, table.column)
+# Columns left out of the update policy are only written on insert
+# Rows are sent with multi-row VALUES lists, PAGE_SIZE rows per round trip
+# Updates are guarded with IS DISTINCT FROM so identical rows are not rewritten (no dead tuples,
+# no WAL), and RETURNING tells inserted rows apart from rows that actually changed
+
+PAGE_SIZE = 1000
+
+UPDATE_POLICIES = ("overwrite", "coalesce")
+
+# ----------------------
+# Table spec
+# ----------------------
+def table_spec(table, columns, conflict, update="overwrite", compare_as_text=()):
+    columns = list(columns)
+    conflict = list(conflict)
+
+    # A single policy applies to every non-key column
+    if isinstance(update, str):
+        update = {column: update for column in columns if column not in conflict}
+
+    for column, policy in update.items():
+        if column not in columns or column in conflict:
+            raise ValueError(f"Cannot update column {column} of {table}")
+        if policy not in UPDATE_POLICIES:
+            raise ValueError(f"Unknown update policy {policy} for {table}.{column}")
+
+    return {
+        "table": table,
+        "columns": columns,
+        "conflict": conflict,
+        "update": dict(update),
+        # json columns have no equality operator, compare their text instead
+        "compare_as_text": list(compare_as_text)
+    }
+
+# ----------------------
+# Query builder
+# ----------------------
+def build_upsert_query(spec):
+    table = sql.Identifier(spec["table"])
+
+    query = sql.SQL("INSERT INTO {table} ({columns}) VALUES %s ON CONFLICT ({conflict})").format(
+        table=table,
+        columns=sql.SQL(", ").join(map(sql.Identifier, spec["columns"])),
+        conflict=sql.SQL(", ").join(map(sql.Identifier, spec["conflict"]))
+    )
+
+    if not spec["update"]:
+        return query + sql.SQL(" DO NOTHING")
+
+    assignments = []
+    current_values = []
+    new_values = []
+    for column, policy in spec["update"].items():
+        if policy == "coalesce":
+            value = sql.SQL("COALESCE(EXCLUDED.{column}, {table}.{column})").format(
+                column=sql.Identifier(column), table=table
+            )
+        else:
+            value = sql.SQL("EXCLUDED.{column}").format(column=sql.Identifier(column))
+        assignments.append(sql.SQL("{column} = {value}").format(column=sql.Identifier(column), value=value))
+
+        current = sql.SQL("{table}.{column}").format(table=table, column=sql.Identifier(column))
+        if column in spec["compare_as_text"]:
+            current = sql.SQL("{}::text").format(current)
+            value = sql.SQL("({})::text").format(value)
+        current_values.append(current)
+        new_values.append(value)
+
+    # Only rewrite the row when at least one updated column would change
+    guard = sql.SQL(" WHERE ({current}) IS DISTINCT FROM ({new})").format(
+        current=sql.SQL(", ").join(current_values),
+        new=sql.SQL(", ").join(new_values)
+    )
+
+    return query + sql.SQL(" DO UPDATE SET ") + sql.SQL(", ").join(assignments) + guard
+
+def build_returning_query(spec):
+    # Skipped rows return nothing; xmax = 0 marks a freshly inserted row, followed by its conflict key
+    return build_upsert_query(spec) + sql.SQL(" RETURNING (xmax = 0) AS inserted, {conflict}").format(
+        conflict=sql.SQL(", ").join(map(sql.Identifier, spec["conflict"]))
+    )
+
+# ----------------------
+# Upsert
+# ----------------------
+def upsert_rows(cur, spec, rows, page_size=PAGE_SIZE, changed_keys=None):
+    # Returns counters: rows sent, rows inserted and existing rows that actually changed
+    # The conflict keys of inserted and changed rows are appended to changed_keys when given
+    # A multi-row ON CONFLICT DO UPDATE cannot touch the same row twice, so keep the last
+    # occurrence of each conflict key
+    deduplicated = {}
+    for row in rows:
+        key = tuple(row[column] for column in spec["conflict"])
+        deduplicated[key] = tuple(row[column] for column in spec["columns"])
+
+    counts = {"rows": len(deduplicated), "inserted": 0, "updated": 0}
+    if not deduplicated:
+        return counts
+
+    written = execute_values(
+        cur, build_returning_query(spec), list(deduplicated.values()), page_size=page_size, fetch=True
+    )
+    for inserted, *key in written:
+        counts["inserted" if inserted else "updated"] += 1
+        if changed_keys is not None:
+            changed_keys.append(tuple(key))
+
+    return counts
+
+def add_counts(total, counts):
+    for key, value in counts.items():
+        total[key] = total.get(key, 0) + value
+    return total
+
+def changed_rows(counts):
+    return counts.get("inserted", 0) + counts.get("updated", 0)
+
+def format_counts(counts):
+    changed = changed_rows(counts)
+    return (
+        f"{counts.get('rows', 0)} processed, {changed} changed "
+        f"({counts.get('inserted', 0)} inserted, {counts.get('updated', 0)} updated)"
+    )
@@ -0,0 +1,67 @@
+# changes.py
+
+import json
+from blinker import signal
+
+# Change notifications from the ingest stages
+# A stage publishes once it has committed rows that actually changed:
+#   - data_versions gets its (table, season) version bumped (ETag / Last-Modified in the API)
+#   - data_committed is sent to in-process receivers (the API response cache) with the table name,
+#     the season code (None for tables without seasons), the changed keys and the new data version
+#     (version, changed_at) of the (table, season) row
+#   - a NOTIFY on CHANGE_CHANNEL carries the same (table, season_code, keys, version, changed_at) to other
+#     processes; the API workers listen (app/change_feed.py) and replay it as data_committed in their own
+#     process
+# Stages publish after committing their own rows; the version bump and the notification are committed
+# together, before receivers are signalled, so nobody sees the new version ahead of the data
+data_committed = signal("bdc-data-committed")
+
+CHANGE_CHANNEL = "bdc_changes"
+
+# NOTIFY payloads must stay under 8000 bytes; long key lists are split over several notifications
+MAX_PAYLOAD_BYTES = 7000
+
+def bump_version(cur, table, season_code=None):
+    cur.execute("""
+        INSERT INTO data_versions (table_name, season_code)
+        VALUES (%s, %s)
+        ON CONFLICT (table_name, season_code) DO UPDATE SET
+            version = data_versions.version + 1,
+            changed_at = now()
+        RETURNING version, changed_at;
+    """, (table, season_code or ""))
+    return cur.fetchone()
+
+def change_payloads(table, season_code, keys, version=None, changed_at=None):
+    def payload(chunk):
+        return json.dumps({
+            "table": table,
+            "season_code": season_code,
+            "keys": chunk,
+            "version": version,
+            "changed_at": changed_at.isoformat() if changed_at else None
+        })
+
+    chunk = []
+    size = len(payload([]))
+    for key in keys:
+        key_size = len(json.dumps(key)) + 2
+        if chunk and size + key_size > MAX_PAYLOAD_BYTES:
+            yield payload(chunk)
+            chunk, size = [], len(payload([]))
+        chunk.append(key)
+        size += key_size
+    yield payload(chunk)
+
+def notify_change(cur, table, season_code=None, keys=None, version=None, changed_at=None):
+    # Delivered to listeners when the transaction commits (at once under autocommit)
+    for payload in change_payloads(table, season_code, list(keys or []), version, changed_at):
+        cur.execute("SELECT pg_notify(%s, %s);", (CHANGE_CHANNEL, payload))
+
+def publish_change(cur, table, season_code=None, keys=None):
+    keys = list(keys or [])
+    version, changed_at = bump_version(cur, table, season_code)
+    notify_change(cur, table, season_code, keys, version, changed_at)
+    if not cur.connection.autocommit:
+        cur.connection.commit()
+    data_committed.send(table, season_code=season_code, keys=keys, version=version, changed_at=changed_at)
@@ -13,6 +13,17 @@ DB_CONFIG = {
     'options': '-c client_encoding=UTF8'
 }
 
+# Read traffic (the API) can go to a replica or a separately tuned server; every DB_READ_* variable
+# falls back to its DB_* counterpart, so by default reads use the same server through their own pool
+READ_DB_CONFIG = {
+    'host': os.getenv('DB_READ_HOST', DB_CONFIG['host']),
+    'port': os.getenv('DB_READ_PORT', DB_CONFIG['port']),
+    'dbname': os.getenv('DB_READ_NAME', DB_CONFIG['dbname']),
+    'user': os.getenv('DB_READ_USER', DB_CONFIG['user']),
+    'password': os.getenv('DB_READ_PASSWORD', DB_CONFIG['password']),
+    'options': '-c client_encoding=UTF8 -c default_transaction_read_only=on'
+}
+
 # Detect current season automatically based on current date
 current_date = datetime.now()
 current_year = current_date.year
@@ -24,3 +35,7 @@ SEASONS = [season_year]
 #SEASONS = list(range(2000, 2030))
 
 COMPETITION = "E"
+
+# Per-game stages can be limited to some games: INGEST_GAMECODES is a comma-separated list of gamecodes
+# (set by run_ingests_scheduled.py for the games that just ended); unset means every game of SEASONS
+GAMECODES = [code for code in os.getenv("INGEST_GAMECODES", "").split(",") if code] or None
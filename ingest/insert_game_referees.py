@@ -1,7 +1,7 @@
 import psycopg2
 import requests
 from tqdm import tqdm
-from config import DB_CONFIG, SEASONS, COMPETITION
+from config import DB_CONFIG, GAMECODES, SEASONS, COMPETITION
 
 # Insert referees per game into the game_referees table using V2 API
 # For each game, extract referee1, referee2, referee3, referee4
@@ -41,6 +41,8 @@ def insert_game_referees():
 
                 for game in games:
                     gamecode = game.get("identifier")
+                    if GAMECODES and gamecode not in GAMECODES:
+                        continue
 
                     # Check referees 1 to 4
                     for ref_num in range(1, 5):
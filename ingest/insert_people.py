@@ -1,6 +1,7 @@
 import psycopg2
 import requests
 from config import DB_CONFIG
+from changes import publish_change
 from tqdm import tqdm
 
 def insert_people():
@@ -24,6 +25,8 @@ def insert_people():
     conn = psycopg2.connect(**DB_CONFIG)
     conn.autocommit = True
 
+    inserted_codes = []
+
     with conn.cursor() as cur, tqdm(total=total, desc="Inserting People") as pbar:
         while OFFSET < total:
             try:
@@ -77,6 +80,8 @@ def insert_people():
                             twitter_account, instagram_account, facebook_account, is_referee, image_url
                         )
                     )
+                    if cur.rowcount:
+                        inserted_codes.append(person_code)
                     pbar.update(1)
 
                 OFFSET += LIMIT
@@ -85,6 +90,10 @@ def insert_people():
                 print(f"Error at offset {OFFSET}: {e}")
                 break
 
+        # New people reach the API search index through their codes
+        if inserted_codes:
+            publish_change(cur, "people", keys=inserted_codes)
+
     conn.close()
     print("Insertion completed.")
 
@@ -5,25 +5,73 @@ from tqdm import tqdm
 import json
 import pandas as pd
 from euroleague_api.play_by_play_data import PlayByPlay
-from config import DB_CONFIG, SEASONS
+from config import DB_CONFIG, GAMECODES, SEASONS
+from bulk_upsert import table_spec, upsert_rows, changed_rows
+from changes import publish_change
+from partitions import ensure_season_partition
+from vocabularies import encode_rows, forget_codes
+
+# play_by_play is partitioned by season_code; each game is written with a single bulk insert
+# event_type and description are stored as codes (see vocabularies.py), read them through play_by_play_view
+PLAY_BY_PLAY = table_spec(
+    "play_by_play",
+    columns=[
+        "gamecode", "play_number", "team_code", "person_code", "period",
+        "time_string", "event_type_id", "description_id", "points_a", "points_b", "season_code"
+    ],
+    conflict=["season_code", "gamecode", "play_number"],
+    update={}
+)
 
 def connect_db():
     return psycopg2.connect(**DB_CONFIG)
 
 def get_all_games():
-    query = "SELECT gamecode, season_code FROM games WHERE season_code = %s"
+    query = """
+        SELECT gamecode, season_code FROM games
+        WHERE season_code = %s
+          AND (%s::text[] IS NULL OR gamecode = ANY(%s))
+    """
     with connect_db() as conn:
         with conn.cursor() as cur:
-            cur.execute(query, (f"E{SEASONS[0]}",))
+            cur.execute(query, (f"E{SEASONS[0]}", GAMECODES, GAMECODES))
             return cur.fetchall()
-        
+
+def build_rows(df, gamecode, season_code):
+    rows = []
+    for _, row in df.iterrows():
+        player_id = row.get("PLAYER_ID")
+        points_a = row.get("POINTS_A")
+        points_b = row.get("POINTS_B")
+
+        rows.append({
+            "gamecode": gamecode,
+            "play_number": row.get("NUMBEROFPLAY"),
+            "team_code": row.get("CODETEAM") or None,
+            "person_code": player_id[1:] if isinstance(player_id, str) and player_id.startswith("P") else None,
+            "period": row.get("PERIOD"),
+            "time_string": row.get("MARKERTIME"),
+            "event_type": row.get("PLAYTYPE") or "Unknown",
+            "description": row.get("PLAYINFO"),
+            # Normalizar valores NaN
+            "points_a": None if pd.isna(points_a) else points_a,
+            "points_b": None if pd.isna(points_b) else points_b,
+            "season_code": season_code
+        })
+    return rows
+
 def insert_play_by_play():
     games = get_all_games()
     pbp = PlayByPlay()
     error_count = 0
+    changed_games = {}
 
     with connect_db() as conn:
         with conn.cursor() as cur:
+            for season_code in {season_code for _, season_code in games}:
+                ensure_season_partition(cur, "play_by_play", season_code)
+            conn.commit()
+
             for gamecode, season_code in tqdm(games, desc="Inserting Play-By-Play"):
                 try:
                     season_year = int(season_code[-4:])
@@ -33,50 +81,19 @@ def insert_play_by_play():
                     if df.empty:
                         continue
 
-                    for _, row in df.iterrows():
-                        play_number = row.get("NUMBEROFPLAY")
-                        team_code = row.get("CODETEAM") or None
-                        player_id = row.get("PLAYER_ID")
-                        person_code = player_id[1:] if isinstance(player_id, str) and player_id.startswith("P") else None
-                        period = row.get("PERIOD")
-                        time_string = row.get("MARKERTIME")
-                        event_type = row.get("PLAYTYPE") or "Unknown"
-                        description = row.get("PLAYINFO")
-                        points_a = row.get("POINTS_A")
-                        points_b = row.get("POINTS_B")
-
-                        # Normalizar valores NaN
-                        points_a = None if pd.isna(points_a) else points_a
-                        points_b = None if pd.isna(points_b) else points_b
-
-                        insert_query = """
-                            INSERT INTO play_by_play (
-                                gamecode, play_number, team_code, person_code, period,
-                                time_string, event_type, description, points_a, points_b, season_code
-                            )
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT DO NOTHING
-                        """
-
-                        cur.execute(insert_query, (
-                            gamecode,
-                            play_number,
-                            team_code,
-                            person_code,
-                            period,
-                            time_string,
-                            event_type,
-                            description,
-                            points_a,
-                            points_b,
-                            season_code
-                        ))
-
+                    counts = upsert_rows(cur, PLAY_BY_PLAY, encode_rows(cur, build_rows(df, gamecode, season_code)))
                     conn.commit()
 
+                    if changed_rows(counts):
+                        changed_games.setdefault(season_code, []).append(gamecode)
+
                 except Exception:
                     error_count += 1
                     conn.rollback()
+                    forget_codes()
+
+            for season_code, gamecodes in changed_games.items():
+                publish_change(cur, "play_by_play", season_code, gamecodes)
 
     print(f"\n✅ Play-by-play ingestion completed. Total errors: {error_count}")
 
@@ -1,27 +1,55 @@
 import psycopg2
 import requests
 from tqdm import tqdm
-from config import DB_CONFIG, SEASONS, COMPETITION
+from config import DB_CONFIG, GAMECODES, SEASONS, COMPETITION
+from bulk_upsert import table_spec, upsert_rows, add_counts, changed_rows, format_counts
+from changes import publish_change
 
 # Insert or update player stats per game into player_game_stats table using V3 API
 # For each game, extract game_number and retrieve player statistics
 # Insert player data including stats, position, and starting_five flag
 # Use ON CONFLICT DO UPDATE to update existing records with missing fields (e.g. dorsal)
+# Rows are collected per season and written with a single bulk upsert
+
+PLAYER_GAME_STATS = table_spec(
+    "player_game_stats",
+    columns=[
+        "gamecode", "person_code", "team_code", "points", "minutes_played", "pir",
+        "field_goals_2_made", "field_goals_2_attempted", "field_goals_3_made", "field_goals_3_attempted",
+        "free_throws_made", "free_throws_attempted", "total_rebounds", "offensive_rebounds",
+        "defensive_rebounds", "assists", "steals", "turnovers", "blocks_favour", "blocks_against",
+        "fouls_committed", "fouls_received", "plus_minus", "start_five", "dorsal", "position",
+        "position_name", "starting_five"
+    ],
+    conflict=["gamecode", "person_code"],
+    update={
+        "dorsal": "coalesce",
+        "position": "coalesce",
+        "position_name": "coalesce",
+        "start_five": "coalesce",
+        "starting_five": "coalesce"
+    }
+)
 
 def insert_player_game_stats():
     conn = psycopg2.connect(**DB_CONFIG)
     conn.autocommit = True
 
     with conn.cursor() as cur:
-        total_upserts = 0
+        totals = {}
 
         # Get gamecode → game_number mapping from database
-        cur.execute("SELECT gamecode, game_number FROM games WHERE game_number IS NOT NULL;")
+        cur.execute("""
+            SELECT gamecode, game_number FROM games
+            WHERE game_number IS NOT NULL
+              AND (%s::text[] IS NULL OR gamecode = ANY(%s));
+        """, (GAMECODES, GAMECODES))
         game_map = dict(cur.fetchall())
 
         # Iterate through each season to process relevant games
         for season in tqdm(SEASONS, desc="Inserting player stats per season"):
             season_code = f"{COMPETITION}{season}"
+            season_rows = []
 
             for gamecode, game_number in game_map.items():
                 if not gamecode.startswith(season_code):
@@ -101,36 +129,18 @@ def insert_player_game_stats():
                             "starting_five": stats.get("startFive", False)
                         }
 
-                        # Upsert player game stats: insert or update if null
-                        cur.execute("""
-                            INSERT INTO player_game_stats (
-                                gamecode, person_code, team_code, points, minutes_played, pir,
-                                field_goals_2_made, field_goals_2_attempted, field_goals_3_made, field_goals_3_attempted,
-                                free_throws_made, free_throws_attempted, total_rebounds, offensive_rebounds,
-                                defensive_rebounds, assists, steals, turnovers, blocks_favour, blocks_against,
-                                fouls_committed, fouls_received, plus_minus, start_five, dorsal, position,
-                                position_name, starting_five
-                            ) VALUES (
-                                %(gamecode)s, %(person_code)s, %(team_code)s, %(points)s, %(minutes_played)s, %(pir)s,
-                                %(field_goals_2_made)s, %(field_goals_2_attempted)s, %(field_goals_3_made)s, %(field_goals_3_attempted)s,
-                                %(free_throws_made)s, %(free_throws_attempted)s, %(total_rebounds)s, %(offensive_rebounds)s,
-                                %(defensive_rebounds)s, %(assists)s, %(steals)s, %(turnovers)s, %(blocks_favour)s, %(blocks_against)s,
-                                %(fouls_committed)s, %(fouls_received)s, %(plus_minus)s, %(start_five)s, %(dorsal)s, %(position)s,
-                                %(position_name)s, %(starting_five)s
-                            )
-                            ON CONFLICT (gamecode, person_code)
-                            DO UPDATE SET
-                                dorsal = COALESCE(EXCLUDED.dorsal, player_game_stats.dorsal),
-                                position = COALESCE(EXCLUDED.position, player_game_stats.position),
-                                position_name = COALESCE(EXCLUDED.position_name, player_game_stats.position_name),
-                                start_five = COALESCE(EXCLUDED.start_five, player_game_stats.start_five),
-                                starting_five = COALESCE(EXCLUDED.starting_five, player_game_stats.starting_five);
-                        """, values)
-
-                        total_upserts += 1
+                        season_rows.append(values)
+
+            changed_keys = []
+            counts = upsert_rows(cur, PLAYER_GAME_STATS, season_rows, changed_keys=changed_keys)
+            add_counts(totals, counts)
+
+            if changed_rows(counts):
+                gamecodes = sorted({gamecode for gamecode, _ in changed_keys})
+                publish_change(cur, "player_game_stats", season_code, gamecodes)
 
     conn.close()
-    print(f"Insertion complete. Total player stats inserted or updated: {total_upserts}")
+    print(f"Insertion complete. Player stats: {format_counts(totals)}")
 
 if __name__ == "__main__":
     insert_player_game_stats()
@@ -1,25 +1,48 @@
 import psycopg2
 import requests
 from tqdm import tqdm
-from config import DB_CONFIG, SEASONS, COMPETITION
+from config import DB_CONFIG, GAMECODES, SEASONS, COMPETITION
+from bulk_upsert import table_spec, upsert_rows, add_counts, changed_rows, format_counts
+from changes import publish_change
+
+# Insert or update player stats per season and phase into player_season_stats table using V2 API
+# Rows are collected per season and written with a single bulk upsert
+
+PLAYER_SEASON_STATS = table_spec(
+    "player_season_stats",
+    columns=[
+        "season_code", "person_code", "phase_type", "team_code",
+        "games_played", "games_started", "minutes_played", "points", "pir",
+        "field_goals_2_made", "field_goals_2_attempted",
+        "field_goals_3_made", "field_goals_3_attempted",
+        "free_throws_made", "free_throws_attempted",
+        "total_rebounds", "offensive_rebounds", "defensive_rebounds",
+        "assists", "steals", "turnovers", "blocks", "blocks_against",
+        "fouls_committed", "fouls_drawn", "plus_minus",
+        "wins", "losses", "double_doubles", "triple_doubles"
+    ],
+    conflict=["season_code", "person_code", "phase_type"]
+)
 
 def insert_player_season_stats():
     conn = psycopg2.connect(**DB_CONFIG)
     conn.autocommit = True
 
     with conn.cursor() as cur:
-        total_inserts = 0
+        totals = {}
 
         for season in tqdm(SEASONS, desc="Inserting player season stats"):
             season_code = f"{COMPETITION}{season}"
 
-            # ⚠️ Solo jugadores que jugaron en esta temporada
+            # ⚠️ Solo jugadores que jugaron en esta temporada (o en los partidos de GAMECODES)
             cur.execute("""
                 SELECT DISTINCT person_code 
                 FROM player_game_stats 
                 WHERE gamecode LIKE %s
-            """, (f"{season_code}%",))
+                  AND (%s::text[] IS NULL OR gamecode = ANY(%s))
+            """, (f"{season_code}%", GAMECODES, GAMECODES))
             players = [row[0] for row in cur.fetchall()]
+            season_rows = []
 
             for person_code in tqdm(players, leave=False, desc=f"Season {season_code}"):
                 url = f"https://api-live.euroleague.net/v2/competitions/{COMPETITION}/seasons/{season_code}/people/{person_code}/stats"
@@ -110,63 +133,16 @@ def insert_player_season_stats():
                         **stats
                     }
 
-                    cur.execute("""
-                        INSERT INTO player_season_stats (
-                            season_code, person_code, phase_type, team_code,
-                            games_played, games_started, minutes_played, points, pir,
-                            field_goals_2_made, field_goals_2_attempted,
-                            field_goals_3_made, field_goals_3_attempted,
-                            free_throws_made, free_throws_attempted,
-                            total_rebounds, offensive_rebounds, defensive_rebounds,
-                            assists, steals, turnovers, blocks, blocks_against,
-                            fouls_committed, fouls_drawn, plus_minus,
-                            wins, losses, double_doubles, triple_doubles
-                        ) VALUES (
-                            %(season_code)s, %(person_code)s, %(phase_type)s, %(team_code)s,
-                            %(games_played)s, %(games_started)s, %(minutes_played)s, %(points)s, %(pir)s,
-                            %(field_goals_2_made)s, %(field_goals_2_attempted)s,
-                            %(field_goals_3_made)s, %(field_goals_3_attempted)s,
-                            %(free_throws_made)s, %(free_throws_attempted)s,
-                            %(total_rebounds)s, %(offensive_rebounds)s, %(defensive_rebounds)s,
-                            %(assists)s, %(steals)s, %(turnovers)s, %(blocks)s, %(blocks_against)s,
-                            %(fouls_committed)s, %(fouls_drawn)s, %(plus_minus)s,
-                            %(wins)s, %(losses)s, %(double_doubles)s, %(triple_doubles)s
-                        )
-                        ON CONFLICT (season_code, person_code, phase_type)
-                        DO UPDATE SET
-                            team_code = EXCLUDED.team_code,
-                            games_played = EXCLUDED.games_played,
-                            games_started = EXCLUDED.games_started,
-                            minutes_played = EXCLUDED.minutes_played,
-                            points = EXCLUDED.points,
-                            pir = EXCLUDED.pir,
-                            field_goals_2_made = EXCLUDED.field_goals_2_made,
-                            field_goals_2_attempted = EXCLUDED.field_goals_2_attempted,
-                            field_goals_3_made = EXCLUDED.field_goals_3_made,
-                            field_goals_3_attempted = EXCLUDED.field_goals_3_attempted,
-                            free_throws_made = EXCLUDED.free_throws_made,
-                            free_throws_attempted = EXCLUDED.free_throws_attempted,
-                            total_rebounds = EXCLUDED.total_rebounds,
-                            offensive_rebounds = EXCLUDED.offensive_rebounds,
-                            defensive_rebounds = EXCLUDED.defensive_rebounds,
-                            assists = EXCLUDED.assists,
-                            steals = EXCLUDED.steals,
-                            turnovers = EXCLUDED.turnovers,
-                            blocks = EXCLUDED.blocks,
-                            blocks_against = EXCLUDED.blocks_against,
-                            fouls_committed = EXCLUDED.fouls_committed,
-                            fouls_drawn = EXCLUDED.fouls_drawn,
-                            plus_minus = EXCLUDED.plus_minus,
-                            wins = EXCLUDED.wins,
-                            losses = EXCLUDED.losses,
-                            double_doubles = EXCLUDED.double_doubles,
-                            triple_doubles = EXCLUDED.triple_doubles
-                    """, values)
-
-                    total_inserts += 1
+                    season_rows.append(values)
+
+            counts = upsert_rows(cur, PLAYER_SEASON_STATS, season_rows)
+            add_counts(totals, counts)
+
+            if changed_rows(counts):
+                publish_change(cur, "player_season_stats", season_code)
 
     conn.close()
-    print(f"Insertion complete. Total player season stats inserted or updated: {total_inserts}")
+    print(f"Insertion complete. Player season stats: {format_counts(totals)}")
 
 if __name__ == "__main__":
     insert_player_season_stats()
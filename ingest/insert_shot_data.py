@@ -4,25 +4,87 @@ import psycopg2
 from tqdm import tqdm
 import pandas as pd
 from euroleague_api.shot_data import ShotData
-from config import DB_CONFIG, SEASONS
+from config import DB_CONFIG, GAMECODES, SEASONS
+from bulk_upsert import table_spec, upsert_rows, changed_rows
+from changes import publish_change
+from partitions import ensure_season_partition
+from vocabularies import encode_rows, forget_codes
+
+# shot_data is partitioned by season_code; each game is written with a single bulk insert
+# event_type, description and zone are stored as codes (see vocabularies.py), read them through shot_data_view
+SHOT_DATA = table_spec(
+    "shot_data",
+    columns=[
+        "gamecode", "play_number", "team_code", "person_code", "period",
+        "time_string", "event_type_id", "description_id", "season_code",
+        "points_scored", "points_a", "points_b",
+        "coord_x", "coord_y", "zone_id",
+        "fastbreak", "second_chance", "points_off_turnover",
+        "timestamp_utc"
+    ],
+    conflict=["season_code", "gamecode", "play_number"],
+    update={}
+)
 
 def connect_db():
     return psycopg2.connect(**DB_CONFIG)
 
 def get_all_games():
-    query = "SELECT gamecode, season_code FROM games WHERE season_code = %s"
+    query = """
+        SELECT gamecode, season_code FROM games
+        WHERE season_code = %s
+          AND (%s::text[] IS NULL OR gamecode = ANY(%s))
+    """
     with connect_db() as conn:
         with conn.cursor() as cur:
-            cur.execute(query, (f"E{SEASONS[0]}",))
+            cur.execute(query, (f"E{SEASONS[0]}", GAMECODES, GAMECODES))
             return cur.fetchall()
 
+def build_rows(df, gamecode, season_code):
+    rows = []
+    for _, row in df.iterrows():
+        player_id = row.get("ID_PLAYER")
+
+        rows.append({
+            "gamecode": gamecode,
+            "play_number": row.get("NUM_ANOT"),
+            "team_code": row.get("TEAM") or None,
+            "person_code": player_id[1:] if isinstance(player_id, str) and player_id.startswith("P") else None,
+            "period": row.get("MINUTE"),
+            "time_string": row.get("CONSOLE"),
+            "event_type": row.get("ID_ACTION"),
+            "description": row.get("ACTION"),
+            "season_code": season_code,
+            "points_scored": row.get("POINTS"),
+            "points_a": None if pd.isna(row.get("POINTS_A")) else row.get("POINTS_A"),
+            "points_b": None if pd.isna(row.get("POINTS_B")) else row.get("POINTS_B"),
+
+            # Coordenadas y zona
+            "coord_x": row.get("COORD_X"),
+            "coord_y": row.get("COORD_Y"),
+            "zone": row.get("ZONE"),
+
+            # Booleans
+            "fastbreak": bool(row.get("FASTBREAK")),
+            "second_chance": bool(row.get("SECOND_CHANCE")),
+            "points_off_turnover": bool(row.get("POINTS_OFF_TURNOVER")),
+
+            "timestamp_utc": row.get("UTC")
+        })
+    return rows
+
 def insert_shot_data():
     games = get_all_games()
     shot_data = ShotData()
     error_count = 0
+    changed_games = {}
 
     with connect_db() as conn:
         with conn.cursor() as cur:
+            for season_code in {season_code for _, season_code in games}:
+                ensure_season_partition(cur, "shot_data", season_code)
+            conn.commit()
+
             for gamecode, season_code in tqdm(games, desc="Inserting Shot Data"):
                 try:
                     season_year = int(season_code[-4:])
@@ -32,70 +94,19 @@ def insert_shot_data():
                     if df.empty:
                         continue
 
-                    for _, row in df.iterrows():
-                        play_number = row.get("NUM_ANOT")
-                        team_code = row.get("TEAM") or None
-                        player_id = row.get("ID_PLAYER")
-                        person_code = player_id[1:] if isinstance(player_id, str) and player_id.startswith("P") else None
-                        period = row.get("MINUTE")
-                        time_string = row.get("CONSOLE")
-                        event_type = row.get("ID_ACTION")
-                        description = row.get("ACTION")
-                        points_scored = row.get("POINTS")
-
-                        # Coordenadas y zona
-                        coord_x = row.get("COORD_X")
-                        coord_y = row.get("COORD_Y")
-                        zone = row.get("ZONE")
-
-                        # Booleans
-                        fastbreak = bool(row.get("FASTBREAK"))
-                        second_chance = bool(row.get("SECOND_CHANCE"))
-                        points_off_turnover = bool(row.get("POINTS_OFF_TURNOVER"))
-
-                        points_a = None if pd.isna(row.get("POINTS_A")) else row.get("POINTS_A")
-                        points_b = None if pd.isna(row.get("POINTS_B")) else row.get("POINTS_B")
-                        timestamp_utc = row.get("UTC")
-
-                        insert_query = """
-                            INSERT INTO shot_data (
-                                gamecode, play_number, team_code, person_code, period,
-                                time_string, event_type, description, season_code,
-                                points_scored, points_a, points_b,
-                                coord_x, coord_y, zone,
-                                fastbreak, second_chance, points_off_turnover,
-                                timestamp_utc
-                            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT DO NOTHING
-                        """
-
-                        cur.execute(insert_query, (
-                            gamecode,
-                            play_number,
-                            team_code,
-                            person_code,
-                            period,
-                            time_string,
-                            event_type,
-                            description,
-                            season_code,
-                            points_scored,
-                            points_a,
-                            points_b,
-                            coord_x,
-                            coord_y,
-                            zone,
-                            fastbreak,
-                            second_chance,
-                            points_off_turnover,
-                            timestamp_utc
-                        ))
-
+                    counts = upsert_rows(cur, SHOT_DATA, encode_rows(cur, build_rows(df, gamecode, season_code)))
                     conn.commit()
 
+                    if changed_rows(counts):
+                        changed_games.setdefault(season_code, []).append(gamecode)
+
                 except Exception:
                     error_count += 1
                     conn.rollback()
+                    forget_codes()
+
+            for season_code, gamecodes in changed_games.items():
+                publish_change(cur, "shot_data", season_code, gamecodes)
 
     print(f"\n✅ Shot data ingestion completed. Total errors: {error_count}")
 
@@ -4,7 +4,8 @@ import requests
 import psycopg2
 from tqdm import tqdm
 import json
-from config import DB_CONFIG, SEASONS, COMPETITION
+from config import DB_CONFIG, GAMECODES, SEASONS, COMPETITION
+from changes import publish_change
 
 # ----------------------
 # Database connection
@@ -87,8 +88,9 @@ def main():
                         FROM games
                         WHERE season_code = %s
                           AND competition_code = %s
+                          AND (%s::text[] IS NULL OR gamecode = ANY(%s))
                         ORDER BY round_number
-                    """, (f"{COMPETITION}{season}", COMPETITION))
+                    """, (f"{COMPETITION}{season}", COMPETITION, GAMECODES, GAMECODES))
                     rounds = [r[0] for r in cur.fetchall() if r[0] is not None]
 
                     for round_number in rounds:
@@ -101,6 +103,8 @@ def main():
                         except Exception as e:
                             print(f"Error on season {season}, round {round_number}: {e}")
                             conn.rollback()
+
+                    publish_change(cur, "standings", f"{COMPETITION}{season}")
                 except Exception as e:
                     print(f"Error loading rounds for season {season}: {e}")
                     conn.rollback()
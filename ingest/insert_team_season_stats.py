@@ -1,32 +1,52 @@
 import psycopg2
 import requests
 from tqdm import tqdm
-from config import DB_CONFIG, SEASONS, COMPETITION
+from config import DB_CONFIG, GAMECODES, SEASONS, COMPETITION
+from bulk_upsert import table_spec, upsert_rows, add_counts, changed_rows, format_counts
+from changes import publish_change
 
 # Insert or update team stats per season into team_season_stats table using V3 API
 # For each team in each season (based on actual games played), retrieve aggregated statistics from the API
+# Rows are collected per season and written with a single bulk upsert
+
+TEAM_SEASON_STATS = table_spec(
+    "team_season_stats",
+    columns=[
+        "season_code", "team_code", "games_played", "points", "valuation",
+        "field_goals_2_made", "field_goals_2_attempted",
+        "field_goals_3_made", "field_goals_3_attempted",
+        "free_throws_made", "free_throws_attempted",
+        "field_goals_total_made", "field_goals_total_attempted",
+        "total_rebounds", "defensive_rebounds", "offensive_rebounds",
+        "assists", "steals", "turnovers", "blocks_favour", "blocks_against",
+        "fouls_committed", "fouls_received", "plus_minus", "time_played"
+    ],
+    conflict=["season_code", "team_code"]
+)
 
 def insert_team_season_stats():
     conn = psycopg2.connect(**DB_CONFIG)
     conn.autocommit = True
 
     with conn.cursor() as cur:
-        total_inserted = 0
+        totals = {}
 
         for season in tqdm(SEASONS, desc="Inserting team season stats"):
             season_code = f"{COMPETITION}{season}"
 
-            # Get teams that actually played that season
+            # Get teams that actually played that season (or the games of GAMECODES)
             cur.execute("""
                 SELECT DISTINCT team_code
                 FROM (
-                    SELECT home_team_code AS team_code FROM games WHERE season_code = %s
+                    SELECT home_team_code AS team_code, gamecode FROM games WHERE season_code = %(season_code)s
                     UNION
-                    SELECT away_team_code AS team_code FROM games WHERE season_code = %s
-                ) AS season_teams;
-            """, (season_code, season_code))
+                    SELECT away_team_code AS team_code, gamecode FROM games WHERE season_code = %(season_code)s
+                ) AS season_teams
+                WHERE %(gamecodes)s::text[] IS NULL OR gamecode = ANY(%(gamecodes)s);
+            """, {"season_code": season_code, "gamecodes": GAMECODES})
 
             teams = [row[0] for row in cur.fetchall()]
+            season_rows = []
 
             for team_code in teams:
                 url = f"https://api-live.euroleague.net/v3/competitions/{COMPETITION}/seasons/{season_code}/clubs/{team_code}/stats"
@@ -76,56 +96,16 @@ def insert_team_season_stats():
                     "time_played": safe_int(stats.get("timePlayed"))
                 }
 
-                cur.execute("""
-                    INSERT INTO team_season_stats (
-                        season_code, team_code, games_played, points, valuation,
-                        field_goals_2_made, field_goals_2_attempted,
-                        field_goals_3_made, field_goals_3_attempted,
-                        free_throws_made, free_throws_attempted,
-                        field_goals_total_made, field_goals_total_attempted,
-                        total_rebounds, defensive_rebounds, offensive_rebounds,
-                        assists, steals, turnovers, blocks_favour, blocks_against,
-                        fouls_committed, fouls_received, plus_minus, time_played
-                    ) VALUES (
-                        %(season_code)s, %(team_code)s, %(games_played)s, %(points)s, %(valuation)s,
-                        %(field_goals_2_made)s, %(field_goals_2_attempted)s,
-                        %(field_goals_3_made)s, %(field_goals_3_attempted)s,
-                        %(free_throws_made)s, %(free_throws_attempted)s,
-                        %(field_goals_total_made)s, %(field_goals_total_attempted)s,
-                        %(total_rebounds)s, %(defensive_rebounds)s, %(offensive_rebounds)s,
-                        %(assists)s, %(steals)s, %(turnovers)s, %(blocks_favour)s, %(blocks_against)s,
-                        %(fouls_committed)s, %(fouls_received)s, %(plus_minus)s, %(time_played)s
-                    )
-                    ON CONFLICT (season_code, team_code) DO UPDATE SET
-                        games_played = EXCLUDED.games_played,
-                        points = EXCLUDED.points,
-                        valuation = EXCLUDED.valuation,
-                        field_goals_2_made = EXCLUDED.field_goals_2_made,
-                        field_goals_2_attempted = EXCLUDED.field_goals_2_attempted,
-                        field_goals_3_made = EXCLUDED.field_goals_3_made,
-                        field_goals_3_attempted = EXCLUDED.field_goals_3_attempted,
-                        free_throws_made = EXCLUDED.free_throws_made,
-                        free_throws_attempted = EXCLUDED.free_throws_attempted,
-                        field_goals_total_made = EXCLUDED.field_goals_total_made,
-                        field_goals_total_attempted = EXCLUDED.field_goals_total_attempted,
-                        total_rebounds = EXCLUDED.total_rebounds,
-                        defensive_rebounds = EXCLUDED.defensive_rebounds,
-                        offensive_rebounds = EXCLUDED.offensive_rebounds,
-                        assists = EXCLUDED.assists,
-                        steals = EXCLUDED.steals,
-                        turnovers = EXCLUDED.turnovers,
-                        blocks_favour = EXCLUDED.blocks_favour,
-                        blocks_against = EXCLUDED.blocks_against,
-                        fouls_committed = EXCLUDED.fouls_committed,
-                        fouls_received = EXCLUDED.fouls_received,
-                        plus_minus = EXCLUDED.plus_minus,
-                        time_played = EXCLUDED.time_played;
-                """, values)
-
-                total_inserted += 1
+                season_rows.append(values)
+
+            counts = upsert_rows(cur, TEAM_SEASON_STATS, season_rows)
+            add_counts(totals, counts)
+
+            if changed_rows(counts):
+                publish_change(cur, "team_season_stats", season_code)
 
     conn.close()
-    print(f"Insertion complete. Total team season stats inserted or updated: {total_inserted}")
+    print(f"Insertion complete. Team season stats: {format_counts(totals)}")
 
 if __name__ == "__main__":
     insert_team_season_stats()
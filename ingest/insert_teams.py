@@ -1,6 +1,7 @@
 import psycopg2
 import requests
 from config import DB_CONFIG
+from changes import publish_change
 
 #Extracting columns team_code, name, alias, is_virtual, country_code, country_name, city, 
 #address, website, tickets_url, facebook_account, twitter_account, instagram_account, 
@@ -15,6 +16,7 @@ def insert_teams():
 
     conn = psycopg2.connect(**DB_CONFIG)
     conn.autocommit = True
+    inserted_codes = []
     with conn.cursor() as cur:
         for club in clubs:
             team_code = club["code"]
@@ -53,6 +55,11 @@ def insert_teams():
                 twitter_account, instagram_account, crest_url, 
                 president, phone, fax, national_competition_code
             ))
+            if cur.rowcount:
+                inserted_codes.append(team_code)
+
+        if inserted_codes:
+            publish_change(cur, "teams", keys=inserted_codes)
     print (f"{len(clubs)} teams inserted successfully")
     conn.close()
 
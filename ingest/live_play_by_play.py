@@ -0,0 +1,168 @@
+# live_play_by_play.py
+
+import argparse
+import time
+import pandas as pd
+import psycopg2
+from euroleague_api.play_by_play_data import PlayByPlay
+from config import DB_CONFIG
+from bulk_upsert import upsert_rows
+from changes import publish_change
+from insert_play_by_play import PLAY_BY_PLAY, build_rows
+from partitions import ensure_season_partition
+from vocabularies import encode_rows, forget_codes
+
+# Live mode for game nights
+# Games in progress are detected from games (utc_date within the live window, not played yet) and
+# scheduled_games (not marked played), then their play-by-play is polled every POLL_INTERVAL seconds.
+# Games whose end of game event is already stored are left out, or a restarted poller would track them
+# again until insert_games marks them played.
+# Only events above the highest play_number already stored are written, and the running score of the
+# last event goes to games, so each poll writes (and publishes) only what happened since the previous one.
+# The feed itself is always the whole game: the upstream endpoint has no "since" parameter
+#
+#   python live_play_by_play.py            poll until no game is live
+#   python live_play_by_play.py --once     one poll round (cron)
+
+POLL_INTERVAL = 15
+DETECT_INTERVAL = 60
+LIVE_WINDOW_HOURS = 3
+LEAD_MINUTES = 10
+
+# Play type of the final event of a game
+END_OF_GAME = "EG"
+
+LIVE_GAMES_QUERY = """
+    SELECT g.gamecode, g.season_code
+    FROM games g
+    LEFT JOIN scheduled_games s ON s.gamecode = g.gamecode
+    WHERE g.utc_date <= (now() AT TIME ZONE 'UTC') + make_interval(mins => %s)
+      AND g.utc_date > (now() AT TIME ZONE 'UTC') - make_interval(hours => %s)
+      AND NOT COALESCE(g.played, FALSE)
+      AND NOT COALESCE(s.played, FALSE)
+      AND NOT EXISTS (
+          SELECT 1 FROM play_by_play_view p
+          WHERE p.season_code = g.season_code AND p.gamecode = g.gamecode AND p.event_type = %s
+      )
+    ORDER BY g.utc_date, g.gamecode
+"""
+
+def get_live_games(cur):
+    cur.execute(LIVE_GAMES_QUERY, (LEAD_MINUTES, LIVE_WINDOW_HOURS, END_OF_GAME))
+    return cur.fetchall()
+
+def get_max_play_number(cur, gamecode, season_code):
+    # Backward scan of the primary key of the game's partition
+    cur.execute("""
+        SELECT COALESCE(MAX(play_number), 0)
+        FROM play_by_play
+        WHERE season_code = %s AND gamecode = %s
+    """, (season_code, gamecode))
+    return cur.fetchone()[0]
+
+def update_score(cur, gamecode, rows):
+    scored = [row for row in rows if row["points_a"] is not None and row["points_b"] is not None]
+    if not scored:
+        return False
+    last = scored[-1]
+    cur.execute("""
+        UPDATE games
+        SET home_score = %s, away_score = %s
+        WHERE gamecode = %s
+          AND (home_score, away_score) IS DISTINCT FROM (%s, %s)
+    """, (last["points_a"], last["points_b"], gamecode, last["points_a"], last["points_b"]))
+    return cur.rowcount > 0
+
+class LiveGame:
+    def __init__(self, gamecode, season_code, max_play_number):
+        self.gamecode = gamecode
+        self.season_code = season_code
+        self.max_play_number = max_play_number
+        self.finished = False
+
+def poll_game(conn, cur, pbp, game):
+    # Returns the number of new events written
+    season_year = int(game.season_code[-4:])
+    game_number = int(game.gamecode.split("_")[-1])
+    df = pbp.get_game_play_by_play_data(season_year, game_number)
+    if df.empty:
+        return 0
+
+    play_numbers = pd.to_numeric(df["NUMBEROFPLAY"], errors="coerce")
+    new_events = df[play_numbers > game.max_play_number].assign(
+        NUMBEROFPLAY=play_numbers[play_numbers > game.max_play_number].astype(int)
+    ).sort_values("NUMBEROFPLAY")
+    if new_events.empty:
+        return 0
+
+    rows = build_rows(new_events, game.gamecode, game.season_code)
+    try:
+        counts = upsert_rows(cur, PLAY_BY_PLAY, encode_rows(cur, rows))
+        score_changed = update_score(cur, game.gamecode, rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        forget_codes()
+        raise
+
+    game.max_play_number = int(new_events["NUMBEROFPLAY"].max())
+    game.finished = game.finished or bool((new_events["PLAYTYPE"] == END_OF_GAME).any())
+
+    publish_change(cur, "play_by_play", game.season_code, [game.gamecode])
+    if score_changed:
+        publish_change(cur, "games", game.season_code, [game.gamecode])
+    return counts["inserted"]
+
+def run_live(once=False):
+    conn = psycopg2.connect(**DB_CONFIG)
+    pbp = PlayByPlay()
+    tracked = {}
+    last_detection = None
+
+    with conn.cursor() as cur:
+        while True:
+            if last_detection is None or time.monotonic() - last_detection >= DETECT_INTERVAL:
+                live_games = get_live_games(cur)
+                conn.commit()
+                last_detection = time.monotonic()
+
+                # Games no longer live (marked played by insert_games) stop being polled
+                for gamecode in set(tracked) - {gamecode for gamecode, _ in live_games}:
+                    tracked[gamecode].finished = True
+
+                for gamecode, season_code in live_games:
+                    if gamecode not in tracked:
+                        ensure_season_partition(cur, "play_by_play", season_code)
+                        tracked[gamecode] = LiveGame(gamecode, season_code, get_max_play_number(cur, gamecode, season_code))
+                        conn.commit()
+                        print(f"▶ Tracking {gamecode} from play {tracked[gamecode].max_play_number}")
+
+            active = [game for game in tracked.values() if not game.finished]
+            if not active:
+                print("No live games")
+                break
+
+            for game in active:
+                try:
+                    inserted = poll_game(conn, cur, pbp, game)
+                    if inserted:
+                        print(f"{game.gamecode}: {inserted} new events (up to play {game.max_play_number})")
+                    if game.finished:
+                        print(f"■ {game.gamecode} finished")
+                except Exception as e:
+                    print(f"Error polling {game.gamecode}: {e}")
+
+            if once:
+                break
+            time.sleep(POLL_INTERVAL)
+
+    conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Poll the play-by-play of games in progress")
+    parser.add_argument("--once", action="store_true", help="run a single poll round and exit")
+    args = parser.parse_args()
+    run_live(once=args.once)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# migrate.py
+
+import os
+import sys
+import json
+import psycopg2
+from config import DB_CONFIG, SEASONS, COMPETITION
+
+# Versioned schema migrations for the BDC database
+# Migrations are the numbered .sql files in ingest/migrations (0001_baseline.sql, 0002_...)
+# Each pending file runs in its own transaction and is recorded in schema_migrations
+#
+# Usage:
+#   python migrate.py            apply pending migrations
+#   python migrate.py --status   list applied and pending migrations
+#   python migrate.py --check    EXPLAIN the hot queries and flag sequential scans
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+
+# Serializes concurrent runs (cron + manual)
+MIGRATION_LOCK_ID = 74160001
+
+# Queries the ingest stages and the API run on every pass, with sample parameters
+# EXPLAIN runs with enable_seqscan off, so a remaining Seq Scan means no index can serve the predicate
+SAMPLE_SEASON = f"{COMPETITION}{SEASONS[0]}"
+SAMPLE_GAME = f"{SAMPLE_SEASON}_1"
+
+HOT_QUERIES = [
+    (
+        "player_game_stats by season prefix",
+        "SELECT DISTINCT person_code FROM player_game_stats WHERE gamecode LIKE %s",
+        (f"{SAMPLE_SEASON}%",)
+    ),
+    (
+        "games by season",
+        "SELECT gamecode, game_number FROM games WHERE season_code = %s",
+        (SAMPLE_SEASON,)
+    ),
+    (
+        "game rounds by season",
+        "SELECT DISTINCT round_number FROM games WHERE season_code = %s AND competition_code = %s ORDER BY round_number",
+        (SAMPLE_SEASON, COMPETITION)
+    ),
+    (
+        "player_game_stats by game",
+        "SELECT * FROM player_game_stats WHERE gamecode = %s",
+        (SAMPLE_GAME,)
+    ),
+    (
+        "play_by_play by game",
+        "SELECT * FROM play_by_play WHERE gamecode = %s ORDER BY play_number",
+        (SAMPLE_GAME,)
+    ),
+    (
+        "play_by_play by season",
+        "SELECT * FROM play_by_play WHERE season_code = %s",
+        (SAMPLE_SEASON,)
+    ),
+    (
+        "shot_data by game",
+        "SELECT * FROM shot_data WHERE gamecode = %s",
+        (SAMPLE_GAME,)
+    ),
+    (
+        "shot_data by season",
+        "SELECT * FROM shot_data WHERE season_code = %s",
+        (SAMPLE_SEASON,)
+    ),
+    (
+        "games keyset page by season (/api/games)",
+        "SELECT gamecode FROM games WHERE season_code = %s AND utc_date IS NOT NULL "
+        "AND (utc_date, gamecode) > (%s, %s) ORDER BY utc_date, gamecode LIMIT 51",
+        (SAMPLE_SEASON, "2000-01-01", "")
+    ),
+    (
+        "leaderboard top-k (/api/leaders)",
+        "SELECT person_code FROM player_leaderboards WHERE season_code = %s AND phase_type = %s AND stat = %s "
+        "ORDER BY per_game DESC, person_code LIMIT 10",
+        (SAMPLE_SEASON, "RS", "points")
+    ),
+    (
+        "game summary by game (/api/games/<gamecode>/summary)",
+        "SELECT summary FROM game_summaries WHERE gamecode = %s",
+        (SAMPLE_GAME,)
+    )
+]
+
+# ----------------------
+# Migration files
+# ----------------------
+def list_migrations():
+    migrations = []
+    for file_name in sorted(os.listdir(MIGRATIONS_DIR)):
+        if not file_name.endswith(".sql"):
+            continue
+        version = int(file_name.split("_", 1)[0])
+        migrations.append((version, file_name))
+    return migrations
+
+def ensure_migrations_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """)
+
+def get_applied_versions(cur):
+    cur.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cur.fetchall()}
+
+# ----------------------
+# Apply
+# ----------------------
+def apply_migrations(conn):
+    applied_now = []
+
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+        try:
+            ensure_migrations_table(cur)
+            conn.commit()
+            applied = get_applied_versions(cur)
+
+            for version, file_name in list_migrations():
+                if version in applied:
+                    continue
+
+                with open(os.path.join(MIGRATIONS_DIR, file_name), encoding="utf-8") as f:
+                    statements = f.read()
+
+                try:
+                    cur.execute(statements)
+                    cur.execute(
+                        "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                        (version, file_name)
+                    )
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    print(f"❌ Migration {file_name} failed: {e}")
+                    raise
+
+                applied_now.append(file_name)
+                print(f"✔ Applied {file_name}")
+        finally:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+            conn.commit()
+
+    return applied_now
+
+def print_status(conn):
+    with conn.cursor() as cur:
+        ensure_migrations_table(cur)
+        conn.commit()
+        applied = get_applied_versions(cur)
+
+    for version, file_name in list_migrations():
+        state = "applied" if version in applied else "pending"
+        print(f"{version:04d}  {state:8}  {file_name}")
+
+# ----------------------
+# Query plan check
+# ----------------------
+def find_seq_scans(plan):
+    scans = []
+    if plan.get("Node Type") == "Seq Scan":
+        scans.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        scans.extend(find_seq_scans(child))
+    return scans
+
+def check_query_plans(conn):
+    flagged = []
+
+    with conn.cursor() as cur:
+        for name, query, params in HOT_QUERIES:
+            cur.execute("SET LOCAL enable_seqscan = off")
+            cur.execute(f"EXPLAIN (FORMAT JSON) {query}", params)
+            plan = cur.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            conn.rollback()
+
+            scans = find_seq_scans(plan[0]["Plan"])
+            if scans:
+                flagged.append(name)
+                print(f"⚠️ {name}: sequential scan on {', '.join(scans)}")
+            else:
+                print(f"✔ {name}")
+
+    return flagged
+
+def main():
+    conn = psycopg2.connect(**DB_CONFIG)
+
+    try:
+        if "--status" in sys.argv:
+            print_status(conn)
+        elif "--check" in sys.argv:
+            flagged = check_query_plans(conn)
+            print(f"\nQuery plan check completed. Queries with sequential scans: {len(flagged)}")
+            if flagged:
+                sys.exit(1)
+        else:
+            applied = apply_migrations(conn)
+            print(f"Migrations complete. Applied: {len(applied)}")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
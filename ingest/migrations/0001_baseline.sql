@@ -0,0 +1,350 @@
+-- Baseline schema: the tables and columns written by the ingest stages
+-- Every statement is IF NOT EXISTS so an existing database is adopted as version 1 untouched
+
+CREATE TABLE IF NOT EXISTS competitions (
+    competition_code TEXT PRIMARY KEY,
+    name TEXT
+);
+
+CREATE TABLE IF NOT EXISTS seasons (
+    season_code TEXT PRIMARY KEY,
+    competition_code TEXT,
+    start_year INTEGER,
+    name TEXT,
+    alias TEXT,
+    start_date TIMESTAMP,
+    end_date TIMESTAMP,
+    winner_team_code TEXT
+);
+
+CREATE TABLE IF NOT EXISTS teams (
+    team_code TEXT PRIMARY KEY,
+    name TEXT,
+    alias TEXT,
+    is_virtual BOOLEAN,
+    country_code TEXT,
+    country_name TEXT,
+    city TEXT,
+    address TEXT,
+    website TEXT,
+    tickets_url TEXT,
+    facebook_account TEXT,
+    twitter_account TEXT,
+    instagram_account TEXT,
+    crest_url TEXT,
+    president TEXT,
+    phone TEXT,
+    fax TEXT,
+    national_competition_code TEXT
+);
+
+CREATE TABLE IF NOT EXISTS team_info (
+    team_code TEXT PRIMARY KEY,
+    description TEXT
+);
+
+CREATE TABLE IF NOT EXISTS venues (
+    venue_code TEXT PRIMARY KEY,
+    name TEXT,
+    capacity INTEGER,
+    address TEXT,
+    active BOOLEAN,
+    notes TEXT,
+    images TEXT
+);
+
+CREATE TABLE IF NOT EXISTS team_venues (
+    team_code TEXT NOT NULL,
+    venue_code TEXT NOT NULL,
+    season_code TEXT NOT NULL,
+    is_primary BOOLEAN,
+    PRIMARY KEY (team_code, venue_code, season_code)
+);
+
+CREATE TABLE IF NOT EXISTS people (
+    person_code TEXT PRIMARY KEY,
+    name TEXT,
+    alias TEXT,
+    passport_name TEXT,
+    passport_surname TEXT,
+    jersey_name TEXT,
+    abbreviated_name TEXT,
+    country_code TEXT,
+    country_name TEXT,
+    height INTEGER,
+    weight INTEGER,
+    birth_date DATE,
+    birth_country_code TEXT,
+    birth_country_name TEXT,
+    twitter_account TEXT,
+    instagram_account TEXT,
+    facebook_account TEXT,
+    is_referee BOOLEAN,
+    image_url TEXT
+);
+
+CREATE TABLE IF NOT EXISTS coach_teams (
+    person_code TEXT NOT NULL,
+    team_code TEXT NOT NULL,
+    season_code TEXT NOT NULL,
+    role TEXT,
+    PRIMARY KEY (person_code, team_code, season_code)
+);
+
+CREATE TABLE IF NOT EXISTS player_teams (
+    person_code TEXT NOT NULL,
+    team_code TEXT NOT NULL,
+    season_code TEXT NOT NULL,
+    jersey_number INTEGER,
+    position INTEGER,
+    position_name TEXT,
+    PRIMARY KEY (person_code, team_code, season_code)
+);
+
+CREATE TABLE IF NOT EXISTS games (
+    gamecode TEXT PRIMARY KEY,
+    season_code TEXT,
+    competition_code TEXT,
+    round_number INTEGER,
+    phase_type TEXT,
+    group_name TEXT,
+    date TIMESTAMP,
+    utc_date TIMESTAMP,
+    played BOOLEAN,
+    home_team_code TEXT,
+    away_team_code TEXT,
+    home_score INTEGER,
+    away_score INTEGER,
+    venue_code TEXT,
+    attendance INTEGER,
+    local_timezone TEXT,
+    game_number INTEGER,
+    confirmed_date BOOLEAN,
+    confirmed_hour BOOLEAN,
+    is_neutral_venue BOOLEAN,
+    game_status TEXT,
+    winner_team_code TEXT
+);
+
+CREATE TABLE IF NOT EXISTS scheduled_games (
+    gamecode TEXT PRIMARY KEY,
+    game_number INTEGER,
+    season_code TEXT,
+    round_number INTEGER,
+    round_code TEXT,
+    round_name TEXT,
+    home_team_code TEXT,
+    away_team_code TEXT,
+    date TEXT,
+    hour TEXT,
+    end_hour TEXT,
+    venue_code TEXT,
+    venue_name TEXT,
+    venue_capacity INTEGER,
+    confirmed_date BOOLEAN,
+    confirmed_hour BOOLEAN,
+    played BOOLEAN
+);
+
+CREATE TABLE IF NOT EXISTS game_referees (
+    gamecode TEXT NOT NULL,
+    person_code TEXT NOT NULL,
+    role TEXT,
+    PRIMARY KEY (gamecode, person_code)
+);
+
+CREATE TABLE IF NOT EXISTS player_game_stats (
+    gamecode TEXT NOT NULL,
+    person_code TEXT NOT NULL,
+    team_code TEXT,
+    points INTEGER,
+    minutes_played INTEGER,
+    pir INTEGER,
+    field_goals_2_made INTEGER,
+    field_goals_2_attempted INTEGER,
+    field_goals_3_made INTEGER,
+    field_goals_3_attempted INTEGER,
+    free_throws_made INTEGER,
+    free_throws_attempted INTEGER,
+    total_rebounds INTEGER,
+    offensive_rebounds INTEGER,
+    defensive_rebounds INTEGER,
+    assists INTEGER,
+    steals INTEGER,
+    turnovers INTEGER,
+    blocks_favour INTEGER,
+    blocks_against INTEGER,
+    fouls_committed INTEGER,
+    fouls_received INTEGER,
+    plus_minus INTEGER,
+    start_five BOOLEAN,
+    dorsal INTEGER,
+    position INTEGER,
+    position_name TEXT,
+    starting_five BOOLEAN,
+    PRIMARY KEY (gamecode, person_code)
+);
+
+CREATE TABLE IF NOT EXISTS team_game_stats (
+    gamecode TEXT NOT NULL,
+    team_code TEXT NOT NULL,
+    points INTEGER,
+    valuation INTEGER,
+    field_goals_2_made INTEGER,
+    field_goals_2_attempted INTEGER,
+    field_goals_3_made INTEGER,
+    field_goals_3_attempted INTEGER,
+    free_throws_made INTEGER,
+    free_throws_attempted INTEGER,
+    field_goals_total_made INTEGER,
+    field_goals_total_attempted INTEGER,
+    total_rebounds INTEGER,
+    defensive_rebounds INTEGER,
+    offensive_rebounds INTEGER,
+    assists INTEGER,
+    steals INTEGER,
+    turnovers INTEGER,
+    blocks_favour INTEGER,
+    blocks_against INTEGER,
+    fouls_committed INTEGER,
+    fouls_received INTEGER,
+    plus_minus INTEGER,
+    time_played INTEGER,
+    points_q1 INTEGER,
+    points_q2 INTEGER,
+    points_q3 INTEGER,
+    points_q4 INTEGER,
+    extra_periods JSONB,
+    PRIMARY KEY (gamecode, team_code)
+);
+
+CREATE TABLE IF NOT EXISTS player_season_stats (
+    season_code TEXT NOT NULL,
+    person_code TEXT NOT NULL,
+    phase_type TEXT NOT NULL,
+    team_code TEXT,
+    games_played INTEGER,
+    games_started INTEGER,
+    minutes_played INTEGER,
+    points INTEGER,
+    pir INTEGER,
+    field_goals_2_made INTEGER,
+    field_goals_2_attempted INTEGER,
+    field_goals_3_made INTEGER,
+    field_goals_3_attempted INTEGER,
+    free_throws_made INTEGER,
+    free_throws_attempted INTEGER,
+    total_rebounds INTEGER,
+    offensive_rebounds INTEGER,
+    defensive_rebounds INTEGER,
+    assists INTEGER,
+    steals INTEGER,
+    turnovers INTEGER,
+    blocks INTEGER,
+    blocks_against INTEGER,
+    fouls_committed INTEGER,
+    fouls_drawn INTEGER,
+    plus_minus INTEGER,
+    wins INTEGER,
+    losses INTEGER,
+    double_doubles INTEGER,
+    triple_doubles INTEGER,
+    PRIMARY KEY (season_code, person_code, phase_type)
+);
+
+CREATE TABLE IF NOT EXISTS team_season_stats (
+    season_code TEXT NOT NULL,
+    team_code TEXT NOT NULL,
+    games_played INTEGER,
+    points INTEGER,
+    valuation INTEGER,
+    field_goals_2_made INTEGER,
+    field_goals_2_attempted INTEGER,
+    field_goals_3_made INTEGER,
+    field_goals_3_attempted INTEGER,
+    free_throws_made INTEGER,
+    free_throws_attempted INTEGER,
+    field_goals_total_made INTEGER,
+    field_goals_total_attempted INTEGER,
+    total_rebounds INTEGER,
+    defensive_rebounds INTEGER,
+    offensive_rebounds INTEGER,
+    assists INTEGER,
+    steals INTEGER,
+    turnovers INTEGER,
+    blocks_favour INTEGER,
+    blocks_against INTEGER,
+    fouls_committed INTEGER,
+    fouls_received INTEGER,
+    plus_minus INTEGER,
+    time_played INTEGER,
+    PRIMARY KEY (season_code, team_code)
+);
+
+CREATE TABLE IF NOT EXISTS standings (
+    season_code TEXT NOT NULL,
+    round_number INTEGER NOT NULL,
+    team_code TEXT NOT NULL,
+    position INTEGER,
+    position_change TEXT,
+    games_played INTEGER,
+    games_won INTEGER,
+    games_lost INTEGER,
+    qualified BOOLEAN,
+    group_name TEXT,
+    streaks JSONB,
+    PRIMARY KEY (season_code, round_number, team_code)
+);
+
+CREATE TABLE IF NOT EXISTS play_by_play (
+    gamecode TEXT NOT NULL,
+    play_number INTEGER NOT NULL,
+    team_code TEXT,
+    person_code TEXT,
+    period INTEGER,
+    time_string TEXT,
+    event_type TEXT,
+    description TEXT,
+    points_a INTEGER,
+    points_b INTEGER,
+    season_code TEXT,
+    PRIMARY KEY (gamecode, play_number)
+);
+
+CREATE TABLE IF NOT EXISTS shot_data (
+    gamecode TEXT NOT NULL,
+    play_number INTEGER NOT NULL,
+    team_code TEXT,
+    person_code TEXT,
+    period INTEGER,
+    time_string TEXT,
+    event_type TEXT,
+    description TEXT,
+    season_code TEXT,
+    points_scored INTEGER,
+    points_a INTEGER,
+    points_b INTEGER,
+    coord_x INTEGER,
+    coord_y INTEGER,
+    zone TEXT,
+    fastbreak BOOLEAN,
+    second_chance BOOLEAN,
+    points_off_turnover BOOLEAN,
+    timestamp_utc TEXT,
+    PRIMARY KEY (gamecode, play_number)
+);
+
+CREATE TABLE IF NOT EXISTS images_teams (
+    team_code TEXT NOT NULL,
+    context TEXT NOT NULL,
+    file_path TEXT,
+    PRIMARY KEY (team_code, context)
+);
+
+CREATE TABLE IF NOT EXISTS images_people (
+    person_code TEXT NOT NULL,
+    season_code TEXT NOT NULL,
+    context TEXT NOT NULL,
+    file_path TEXT,
+    PRIMARY KEY (person_code, season_code, context)
+);
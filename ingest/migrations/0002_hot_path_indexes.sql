@@ -0,0 +1,13 @@
+-- Indexes for the predicates used by the ingest stages
+
+-- Season filters on games (insert_team_season_stats, insert_coach_teams, insert_standings, insert_player_teams)
+CREATE INDEX IF NOT EXISTS games_season_code_round_idx ON games (season_code, round_number);
+
+-- gamecode LIKE 'E2024%' (insert_player_season_stats, insert_team_game_stats)
+-- text_pattern_ops keeps prefix matches indexable under any database collation
+CREATE INDEX IF NOT EXISTS player_game_stats_gamecode_pattern_idx ON player_game_stats (gamecode text_pattern_ops);
+CREATE INDEX IF NOT EXISTS player_game_stats_person_code_idx ON player_game_stats (person_code);
+
+-- Season-scoped reads on the event tables; per-game lookups use the (gamecode, play_number) key
+CREATE INDEX IF NOT EXISTS play_by_play_season_code_idx ON play_by_play (season_code);
+CREATE INDEX IF NOT EXISTS shot_data_season_code_idx ON shot_data (season_code);
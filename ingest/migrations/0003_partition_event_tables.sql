@@ -0,0 +1,87 @@
+-- List-partition play_by_play and shot_data by season_code
+-- Each season lives in its own partition (play_by_play_e2024, shot_data_e2024, ...) plus a default
+-- partition for unexpected codes. Season-scoped reads and deletes prune to one partition, and an
+-- old season can be loaded into a standalone table and attached, or detached, without rewriting
+-- the rest of the table.
+
+-- Creates the partition of parent_table for season if missing, moving any rows of that season
+-- out of the default partition first. Called by the ingest stages before they insert a season.
+CREATE OR REPLACE FUNCTION create_season_partition(parent_table TEXT, season TEXT)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    partition_name TEXT := lower(parent_table || '_' || season);
+    default_name TEXT := parent_table || '_default';
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN partition_name;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS)', partition_name, parent_table);
+    EXECUTE format('ALTER TABLE %I ADD CHECK (season_code IS NOT NULL AND season_code = %L)', partition_name, season);
+
+    IF to_regclass(default_name) IS NOT NULL THEN
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM %I WHERE season_code = %L RETURNING *) INSERT INTO %I SELECT * FROM moved',
+            default_name, season, partition_name
+        );
+    END IF;
+
+    EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES IN (%L)', parent_table, partition_name, season);
+    RETURN partition_name;
+END;
+$$;
+
+DO $$
+DECLARE
+    parent_table TEXT;
+    old_table TEXT;
+    season TEXT;
+BEGIN
+    FOREACH parent_table IN ARRAY ARRAY['play_by_play', 'shot_data'] LOOP
+        IF (SELECT relkind FROM pg_class WHERE oid = parent_table::regclass) = 'p' THEN
+            CONTINUE;
+        END IF;
+
+        old_table := parent_table || '_unpartitioned';
+        EXECUTE format('ALTER TABLE %I RENAME TO %I', parent_table, old_table);
+
+        -- The partition key has to be part of the primary key, so it can no longer be NULL
+        EXECUTE format(
+            'UPDATE %I SET season_code = split_part(gamecode, ''_'', 1) WHERE season_code IS NULL',
+            old_table
+        );
+
+        EXECUTE format(
+            'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS) PARTITION BY LIST (season_code)',
+            parent_table, old_table
+        );
+        EXECUTE format('CREATE TABLE %I PARTITION OF %I DEFAULT', parent_table || '_default', parent_table);
+
+        FOR season IN EXECUTE format('SELECT DISTINCT season_code FROM %I', old_table) LOOP
+            PERFORM create_season_partition(parent_table, season);
+        END LOOP;
+
+        EXECUTE format('INSERT INTO %I SELECT * FROM %I', parent_table, old_table);
+        EXECUTE format('DROP TABLE %I', old_table);
+    END LOOP;
+END;
+$$;
+
+-- Keys and indexes are built once, after the copy
+ALTER TABLE play_by_play ALTER COLUMN season_code SET NOT NULL;
+ALTER TABLE shot_data ALTER COLUMN season_code SET NOT NULL;
+
+ALTER TABLE play_by_play DROP CONSTRAINT IF EXISTS play_by_play_pkey;
+ALTER TABLE play_by_play ADD PRIMARY KEY (season_code, gamecode, play_number);
+ALTER TABLE shot_data DROP CONSTRAINT IF EXISTS shot_data_pkey;
+ALTER TABLE shot_data ADD PRIMARY KEY (season_code, gamecode, play_number);
+
+-- Per-game lookups that do not carry the season code
+CREATE INDEX IF NOT EXISTS play_by_play_gamecode_idx ON play_by_play (gamecode, play_number);
+CREATE INDEX IF NOT EXISTS shot_data_gamecode_idx ON shot_data (gamecode, play_number);
+
+-- Partition pruning replaces the season_code indexes from 0002
+DROP INDEX IF EXISTS play_by_play_season_code_idx;
+DROP INDEX IF EXISTS shot_data_season_code_idx;
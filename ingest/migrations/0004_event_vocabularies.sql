@@ -0,0 +1,92 @@
+-- Dictionary-encode the repeated text columns of the event tables
+-- play_by_play.event_type/description and shot_data.event_type/description/zone become smallint
+-- codes into small lookup tables. Both tables share the event type and description vocabularies
+-- (PLAYTYPE and ID_ACTION use the same codes, PLAYINFO and ACTION the same labels).
+-- play_by_play_view and shot_data_view keep the readable columns for existing queries.
+-- Dropped columns are reclaimed as rows are rewritten; run VACUUM FULL on old season partitions
+-- to shrink them right away.
+
+CREATE TABLE IF NOT EXISTS event_types (
+    event_type_id SMALLINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS event_descriptions (
+    description_id SMALLINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS shot_zones (
+    zone_id SMALLINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+INSERT INTO event_types (name)
+SELECT event_type FROM play_by_play WHERE event_type IS NOT NULL
+UNION
+SELECT event_type FROM shot_data WHERE event_type IS NOT NULL
+ON CONFLICT (name) DO NOTHING;
+
+INSERT INTO event_descriptions (name)
+SELECT description FROM play_by_play WHERE description IS NOT NULL
+UNION
+SELECT description FROM shot_data WHERE description IS NOT NULL
+ON CONFLICT (name) DO NOTHING;
+
+INSERT INTO shot_zones (name)
+SELECT DISTINCT zone FROM shot_data WHERE zone IS NOT NULL
+ON CONFLICT (name) DO NOTHING;
+
+ALTER TABLE play_by_play
+    ADD COLUMN event_type_id SMALLINT,
+    ADD COLUMN description_id SMALLINT;
+
+ALTER TABLE shot_data
+    ADD COLUMN event_type_id SMALLINT,
+    ADD COLUMN description_id SMALLINT,
+    ADD COLUMN zone_id SMALLINT;
+
+UPDATE play_by_play p SET
+    event_type_id = (SELECT t.event_type_id FROM event_types t WHERE t.name = p.event_type),
+    description_id = (SELECT d.description_id FROM event_descriptions d WHERE d.name = p.description);
+
+UPDATE shot_data s SET
+    event_type_id = (SELECT t.event_type_id FROM event_types t WHERE t.name = s.event_type),
+    description_id = (SELECT d.description_id FROM event_descriptions d WHERE d.name = s.description),
+    zone_id = (SELECT z.zone_id FROM shot_zones z WHERE z.name = s.zone);
+
+ALTER TABLE play_by_play
+    DROP COLUMN event_type,
+    DROP COLUMN description;
+
+ALTER TABLE shot_data
+    DROP COLUMN event_type,
+    DROP COLUMN description,
+    DROP COLUMN zone;
+
+CREATE INDEX IF NOT EXISTS play_by_play_event_type_idx ON play_by_play (season_code, event_type_id);
+CREATE INDEX IF NOT EXISTS shot_data_event_type_idx ON shot_data (season_code, event_type_id);
+
+CREATE OR REPLACE VIEW play_by_play_view AS
+SELECT
+    p.gamecode, p.play_number, p.team_code, p.person_code, p.period, p.time_string,
+    t.name AS event_type, d.name AS description,
+    p.points_a, p.points_b, p.season_code,
+    p.event_type_id, p.description_id
+FROM play_by_play p
+LEFT JOIN event_types t ON t.event_type_id = p.event_type_id
+LEFT JOIN event_descriptions d ON d.description_id = p.description_id;
+
+CREATE OR REPLACE VIEW shot_data_view AS
+SELECT
+    s.gamecode, s.play_number, s.team_code, s.person_code, s.period, s.time_string,
+    t.name AS event_type, d.name AS description, s.season_code,
+    s.points_scored, s.points_a, s.points_b,
+    s.coord_x, s.coord_y, z.name AS zone,
+    s.fastbreak, s.second_chance, s.points_off_turnover,
+    s.timestamp_utc,
+    s.event_type_id, s.description_id, s.zone_id
+FROM shot_data s
+LEFT JOIN event_types t ON t.event_type_id = s.event_type_id
+LEFT JOIN event_descriptions d ON d.description_id = s.description_id
+LEFT JOIN shot_zones z ON z.zone_id = s.zone_id;
@@ -0,0 +1,7 @@
+-- Keyset pagination for /api/games orders by (utc_date, gamecode)
+-- Each filter gets an index whose trailing columns match that order, so any page is a range scan
+
+CREATE INDEX IF NOT EXISTS games_utc_date_gamecode_idx ON games (utc_date, gamecode);
+CREATE INDEX IF NOT EXISTS games_season_utc_date_idx ON games (season_code, utc_date, gamecode);
+CREATE INDEX IF NOT EXISTS games_home_team_utc_date_idx ON games (home_team_code, utc_date, gamecode);
+CREATE INDEX IF NOT EXISTS games_away_team_utc_date_idx ON games (away_team_code, utc_date, gamecode);
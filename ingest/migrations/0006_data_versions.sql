@@ -0,0 +1,12 @@
+-- Per-table, per-season change versions written by the ingest stages
+-- The API derives ETag / Last-Modified from these rows, so conditional requests are answered
+-- with a primary-key lookup instead of the underlying query
+-- season_code is '' for tables that are not split by season
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    table_name TEXT NOT NULL,
+    season_code TEXT NOT NULL DEFAULT '',
+    version BIGINT NOT NULL DEFAULT 1,
+    changed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (table_name, season_code)
+);
@@ -0,0 +1,49 @@
+-- Precomputed player leaderboards per season, phase and stat
+-- One row per (season, phase, stat, player) with the total, per-game and per-40-minutes values, and
+-- one index per normalization, so a top-k request is a single index range scan
+-- minutes_played holds the API's timePlayed, which is in seconds
+-- Refreshed concurrently by refresh_leaderboards.py at the end of the ingest run
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS player_leaderboards AS
+SELECT
+    s.season_code,
+    s.phase_type,
+    v.stat,
+    s.person_code,
+    s.team_code,
+    s.games_played,
+    s.minutes_played,
+    v.total,
+    ROUND(v.total::numeric / s.games_played, 2) AS per_game,
+    CASE WHEN s.minutes_played > 0 THEN ROUND(v.total::numeric * 2400 / s.minutes_played, 2) END AS per_40
+FROM player_season_stats s
+CROSS JOIN LATERAL (VALUES
+    ('points', s.points),
+    ('pir', s.pir),
+    ('rebounds', s.total_rebounds),
+    ('offensive_rebounds', s.offensive_rebounds),
+    ('defensive_rebounds', s.defensive_rebounds),
+    ('assists', s.assists),
+    ('steals', s.steals),
+    ('blocks', s.blocks),
+    ('turnovers', s.turnovers),
+    ('field_goals_2_made', s.field_goals_2_made),
+    ('field_goals_3_made', s.field_goals_3_made),
+    ('free_throws_made', s.free_throws_made),
+    ('fouls_drawn', s.fouls_drawn),
+    ('plus_minus', s.plus_minus)
+) AS v(stat, total)
+WHERE s.games_played > 0
+  AND v.total IS NOT NULL
+WITH DATA;
+
+-- Required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS player_leaderboards_key_idx
+    ON player_leaderboards (season_code, phase_type, stat, person_code);
+
+CREATE INDEX IF NOT EXISTS player_leaderboards_total_idx
+    ON player_leaderboards (season_code, phase_type, stat, total DESC, person_code);
+CREATE INDEX IF NOT EXISTS player_leaderboards_per_game_idx
+    ON player_leaderboards (season_code, phase_type, stat, per_game DESC, person_code);
+CREATE INDEX IF NOT EXISTS player_leaderboards_per_40_idx
+    ON player_leaderboards (season_code, phase_type, stat, per_40 DESC NULLS LAST, person_code);
@@ -0,0 +1,4 @@
+-- Team and player filters on a season of shot_data (shot charts)
+
+CREATE INDEX IF NOT EXISTS shot_data_team_idx ON shot_data (season_code, team_code);
+CREATE INDEX IF NOT EXISTS shot_data_person_idx ON shot_data (season_code, person_code);
@@ -0,0 +1,12 @@
+-- One denormalized JSON document per played game (game, venue, team and player box scores with names,
+-- referees), rebuilt by ingest/build_game_summaries.py after the stats stages
+-- A game page is then a single primary-key lookup instead of joining six tables per view
+
+CREATE TABLE IF NOT EXISTS game_summaries (
+    gamecode TEXT PRIMARY KEY,
+    season_code TEXT NOT NULL,
+    summary JSONB NOT NULL,
+    built_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS game_summaries_season_code_idx ON game_summaries (season_code);
@@ -0,0 +1,50 @@
+# partitions.py
+
+import sys
+import psycopg2
+from psycopg2 import sql
+from config import DB_CONFIG
+
+# Season partitions for play_by_play and shot_data (see migrations/0003_partition_event_tables.sql)
+# Stages call ensure_season_partition before inserting a season so rows never land in the default partition
+#
+# Usage:
+#   python partitions.py create <table> <season_code>
+#   python partitions.py detach <table> <season_code>
+
+PARTITIONED_TABLES = ("play_by_play", "shot_data")
+
+def partition_name(table, season_code):
+    return f"{table}_{season_code}".lower()
+
+def ensure_season_partition(cur, table, season_code):
+    cur.execute("SELECT create_season_partition(%s, %s)", (table, season_code))
+    return cur.fetchone()[0]
+
+def detach_season_partition(cur, table, season_code):
+    # The detached table keeps its rows and can be archived, dumped or dropped on its own
+    cur.execute(sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(
+        sql.Identifier(table), sql.Identifier(partition_name(table, season_code))
+    ))
+    return partition_name(table, season_code)
+
+def main():
+    if len(sys.argv) != 4 or sys.argv[1] not in ("create", "detach") or sys.argv[2] not in PARTITIONED_TABLES:
+        print("Usage: python partitions.py create|detach play_by_play|shot_data <season_code>")
+        sys.exit(1)
+
+    action, table, season_code = sys.argv[1:]
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        if action == "create":
+            name = ensure_season_partition(cur, table, season_code)
+            print(f"Partition ready: {name}")
+        else:
+            name = detach_season_partition(cur, table, season_code)
+            print(f"Partition detached: {name}")
+    conn.close()
+
+if __name__ == "__main__":
+    main()
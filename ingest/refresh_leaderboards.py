@@ -0,0 +1,44 @@
+import psycopg2
+from config import DB_CONFIG, SEASONS, COMPETITION
+from changes import publish_change
+
+# Refresh the precomputed leaderboard views once the stats stages have run
+# CONCURRENTLY keeps the views readable by the API during the refresh (needs their unique index)
+# Only the ingested seasons can have changed, and of those only the ones whose rows differ after the
+# refresh (checksum of the season's rows before and after) get their versions bumped
+
+MATERIALIZED_VIEWS = ["player_leaderboards"]
+
+# Checksum of the rows of each season, for views with a season_code column
+SEASON_CHECKSUMS_QUERY = """
+    SELECT v.season_code, md5(string_agg(v::text, ',' ORDER BY v::text))
+    FROM {view} v
+    WHERE v.season_code = ANY(%s)
+    GROUP BY v.season_code;
+"""
+
+def season_checksums(cur, view, season_codes):
+    cur.execute(SEASON_CHECKSUMS_QUERY.format(view=view), (season_codes,))
+    return dict(cur.fetchall())
+
+def refresh_leaderboards():
+    conn = psycopg2.connect(**DB_CONFIG)
+    conn.autocommit = True
+    season_codes = [f"{COMPETITION}{season}" for season in SEASONS]
+
+    with conn.cursor() as cur:
+        for view in MATERIALIZED_VIEWS:
+            before = season_checksums(cur, view, season_codes)
+            cur.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view};")
+            after = season_checksums(cur, view, season_codes)
+
+            changed = [season_code for season_code in season_codes if before.get(season_code) != after.get(season_code)]
+            for season_code in changed:
+                publish_change(cur, view, season_code)
+
+            print(f"Refreshed {view} ({len(changed)} seasons changed)")
+
+    conn.close()
+
+if __name__ == "__main__":
+    refresh_leaderboards()
@@ -11,6 +11,7 @@ LOGS_DIR = os.path.join(INGEST_DIR, "..", "logs")
 os.makedirs(LOGS_DIR, exist_ok=True)
 
 SCRIPTS = [
+    "migrate.py",  # apply pending schema migrations before any stage writes
     "insert_coach_teams.py",
     "insert_competitions.py",
     "insert_game_referees.py",
@@ -29,16 +30,13 @@ SCRIPTS = [
     "insert_team_season_stats.py",
     "insert_team_venues.py",
     "insert_teams.py",
-    "insert_venues.py"
+    "insert_venues.py",
+    "build_game_summaries.py",  # after the stats, referee and venue stages
+    "refresh_leaderboards.py"  # after the stats stages
 ]
 
-today = datetime.now().strftime("%Y-%m-%d")
-log_file = os.path.join(LOGS_DIR, f"ingest_{today}.log")
-
-with open(log_file, "w") as log:
-    log.write(f"🔄 Ingestion started at {datetime.now()}\n\n")
-
-    for script in SCRIPTS:
+def run_scripts(scripts, log_file, env=None):
+    for script in scripts:
         script_path = os.path.join(INGEST_DIR, script)
         with open(log_file, "a") as log:
             log.write(f"▶ Running {script}...\n")
@@ -47,7 +45,8 @@ with open(log_file, "w") as log:
                     [PYTHON_EXEC, script_path],
                     stdout=subprocess.PIPE,
                     stderr=subprocess.PIPE,
-                    text=True
+                    text=True,
+                    env=env
                 )
                 log.write(result.stdout)
                 if result.stderr:
@@ -56,5 +55,17 @@ with open(log_file, "w") as log:
                 log.write(f"❌ Failed to run {script}: {e}\n")
             log.write("\n" + "="*80 + "\n\n")
 
+def main():
+    today = datetime.now().strftime("%Y-%m-%d")
+    log_file = os.path.join(LOGS_DIR, f"ingest_{today}.log")
+
+    with open(log_file, "w") as log:
+        log.write(f"🔄 Ingestion started at {datetime.now()}\n\n")
+
+    run_scripts(SCRIPTS, log_file)
+
     with open(log_file, "a") as log:
         log.write(f"\n✅ Ingestion completed at {datetime.now()}\n")
+
+if __name__ == "__main__":
+    main()
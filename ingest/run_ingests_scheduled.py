@@ -0,0 +1,239 @@
+# run_ingests_scheduled.py
+
+import argparse
+import fcntl
+import json
+import os
+import subprocess
+from datetime import datetime, timedelta, timezone
+import psycopg2
+from config import DB_CONFIG
+from live_play_by_play import END_OF_GAME, LEAD_MINUTES, LIVE_WINDOW_HOURS
+from run_ingests_daily import INGEST_DIR, LOGS_DIR, PYTHON_EXEC, SCRIPTS, run_scripts
+
+# Calendar-aware ingestion, meant to replace run_ingests_daily.py in cron (every 10 minutes):
+#   */10 * * * * /home/bdc-admin/bdc-backend/venv/bin/python /home/bdc-admin/bdc-backend/ingest/run_ingests_scheduled.py
+# Each run looks at games (utc_date) and scheduled_games (played) and only runs the stages that are due:
+#   - weekly:    reference data (seasons, competitions, teams, venues, people, rosters)
+#   - daily:     the calendar (scheduled games, dates and hours of games)
+#   - post_game: results, box scores, play-by-play, shots, standings and season stats, run once
+#                POST_GAME_DELAY after a game is expected to end and again FOLLOW_UP_DELAY later for
+#                late corrections; days without games never run them
+#                Only the games that are due are ingested (INGEST_GAMECODES, see config.GAMECODES), with
+#                the season stats of their players and teams and the standings of their rounds, and games
+#                ending within POST_GAME_BATCH_WINDOW of each other are ingested in one run
+# While a game is in progress live_play_by_play.py is started in the background (one process at a time)
+# A run still going when the next one starts makes the new one exit (lock file)
+# Stages keep the order of run_ingests_daily.SCRIPTS; `--all` runs every stage like the daily script
+
+STATE_FILE = os.path.join(LOGS_DIR, "ingest_schedule.json")
+LOCK_FILE = os.path.join(LOGS_DIR, "ingest_schedule.lock")
+
+DAILY_HOUR = 6            # UTC hour from which the daily stages run
+WEEKLY_WEEKDAY = 0        # Monday
+GAME_DURATION = timedelta(hours=2, minutes=15)
+POST_GAME_DELAY = timedelta(minutes=30)
+FOLLOW_UP_DELAY = timedelta(hours=12)
+POST_GAME_BATCH_WINDOW = timedelta(minutes=30)
+FIRST_RUN_LOOKBACK = timedelta(days=1)
+
+# Script -> triggers that run it; every script of SCRIPTS has to be listed
+STAGE_TRIGGERS = {
+    "migrate.py": ("weekly", "daily", "post_game"),
+    "insert_coach_teams.py": ("weekly",),
+    "insert_competitions.py": ("weekly",),
+    "insert_game_referees.py": ("post_game",),
+    "insert_games.py": ("daily", "post_game"),
+    "insert_people.py": ("weekly",),
+    "insert_play_by_play.py": ("post_game",),
+    "insert_player_game_stats.py": ("post_game",),
+    "insert_player_season_stats.py": ("post_game",),
+    "insert_player_teams.py": ("weekly",),
+    "insert_scheduled_games.py": ("daily",),
+    "insert_seasons.py": ("weekly",),
+    "insert_shot_data.py": ("post_game",),
+    "insert_standings.py": ("post_game",),
+    "insert_team_game_stats.py": ("post_game",),
+    "insert_team_info.py": ("weekly",),
+    "insert_team_season_stats.py": ("post_game",),
+    "insert_team_venues.py": ("weekly",),
+    "insert_teams.py": ("weekly",),
+    "insert_venues.py": ("weekly",),
+    "build_game_summaries.py": ("post_game",),
+    "refresh_leaderboards.py": ("post_game",)
+}
+
+# Games expected to end inside a window, with the margin of both post-game runs
+RECENT_GAMES_QUERY = """
+    SELECT g.gamecode, g.utc_date
+    FROM games g
+    WHERE g.utc_date > %s
+      AND g.utc_date <= %s
+"""
+
+LIVE_GAMES_QUERY = """
+    SELECT count(*)
+    FROM games g
+    LEFT JOIN scheduled_games s ON s.gamecode = g.gamecode
+    WHERE g.utc_date <= %s
+      AND g.utc_date > %s
+      AND NOT COALESCE(g.played, FALSE)
+      AND NOT COALESCE(s.played, FALSE)
+      AND NOT EXISTS (
+          SELECT 1 FROM play_by_play_view p
+          WHERE p.season_code = g.season_code AND p.gamecode = g.gamecode AND p.event_type = %s
+      )
+"""
+
+def utc_now():
+    # games.utc_date is a timestamp without time zone holding UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def load_state():
+    if not os.path.isfile(STATE_FILE):
+        return {}
+    with open(STATE_FILE) as f:
+        return json.load(f)
+
+def save_state(state):
+    with open(STATE_FILE, "w") as f:
+        json.dump(state, f, indent=2)
+
+def last_run(state, trigger):
+    value = state.get(trigger)
+    return datetime.fromisoformat(value) if value else None
+
+def latest_boundary(now, period_days, weekday=None):
+    # Most recent DAILY_HOUR (of WEEKLY_WEEKDAY for weekly stages) not after now
+    boundary = now.replace(hour=DAILY_HOUR, minute=0, second=0, microsecond=0)
+    if weekday is not None:
+        boundary -= timedelta(days=(now.weekday() - weekday) % 7)
+    if boundary > now:
+        boundary -= timedelta(days=period_days)
+    return boundary
+
+def weekly_due(state, now):
+    last = last_run(state, "weekly")
+    return last is None or last < latest_boundary(now, 7, WEEKLY_WEEKDAY)
+
+def daily_due(state, now):
+    last = last_run(state, "daily")
+    return last is None or last < latest_boundary(now, 1)
+
+def post_game_due(cur, state, now):
+    # A game is due when its expected end plus one of the delays falls between the last run and now
+    since = last_run(state, "post_game") or now - FIRST_RUN_LOOKBACK
+    delays = (GAME_DURATION + POST_GAME_DELAY, GAME_DURATION + FOLLOW_UP_DELAY)
+    cur.execute(RECENT_GAMES_QUERY, (since - max(delays), now + POST_GAME_BATCH_WINDOW))
+    due = set()
+    oldest_due = None
+    next_due = None
+    for gamecode, utc_date in cur.fetchall():
+        for delay in delays:
+            due_at = utc_date + delay
+            if since < due_at <= now:
+                due.add(gamecode)
+                oldest_due = min(oldest_due or due_at, due_at)
+            elif now < due_at <= now + POST_GAME_BATCH_WINDOW:
+                next_due = min(next_due or due_at, due_at)
+
+    # Another game of the matchday is about to be due: wait and ingest them together, unless the
+    # oldest due game has already waited a whole window
+    if due and next_due and now - oldest_due < POST_GAME_BATCH_WINDOW:
+        return []
+    return sorted(due)
+
+def live_games_count(cur, now):
+    # Same window and conditions as live_play_by_play.py
+    cur.execute(LIVE_GAMES_QUERY, (now + timedelta(minutes=LEAD_MINUTES), now - timedelta(hours=LIVE_WINDOW_HOURS), END_OF_GAME))
+    return cur.fetchone()[0]
+
+def live_running(state):
+    pid = state.get("live_pid")
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return True
+
+def start_live(state, log_file):
+    with open(log_file, "a") as log:
+        process = subprocess.Popen(
+            [PYTHON_EXEC, os.path.join(INGEST_DIR, "live_play_by_play.py")],
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True
+        )
+    state["live_pid"] = process.pid
+    return process.pid
+
+def plan(triggers):
+    return [script for script in SCRIPTS if set(STAGE_TRIGGERS[script]) & triggers]
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the ingest stages that are due")
+    parser.add_argument("--all", action="store_true", help="run every stage, like run_ingests_daily.py")
+    parser.add_argument("--dry-run", action="store_true", help="print the plan without running it")
+    args = parser.parse_args()
+
+    lock = open(LOCK_FILE, "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        print("Previous scheduled run still in progress")
+        return
+
+    now = utc_now()
+    state = load_state()
+    today = datetime.now().strftime("%Y-%m-%d")
+    log_file = os.path.join(LOGS_DIR, f"ingest_{today}.log")
+
+    with psycopg2.connect(**DB_CONFIG) as conn:
+        with conn.cursor() as cur:
+            triggers = set()
+            if args.all or weekly_due(state, now):
+                triggers.add("weekly")
+            if args.all or daily_due(state, now):
+                triggers.add("daily")
+            due_games = post_game_due(cur, state, now)
+            if args.all or due_games:
+                triggers.add("post_game")
+            live_games = live_games_count(cur, now)
+    conn.close()
+
+    scripts = plan(triggers)
+    if args.dry_run:
+        print(f"Triggers: {', '.join(sorted(triggers)) or 'none'}")
+        print(f"Finished games due: {', '.join(due_games) or 'none'}")
+        print(f"Live games: {live_games}")
+        print("\n".join(scripts))
+        return
+
+    if live_games and not live_running(state):
+        pid = start_live(state, log_file)
+        print(f"▶ Live mode started for {live_games} games (pid {pid})")
+
+    if scripts:
+        with open(log_file, "a") as log:
+            log.write(f"🔄 Scheduled ingestion ({', '.join(sorted(triggers))}) started at {datetime.now()}\n")
+            if due_games:
+                log.write(f"Finished games: {', '.join(due_games)}\n")
+            log.write("\n")
+
+        env = None
+        if "post_game" in triggers and not args.all:
+            env = dict(os.environ, INGEST_GAMECODES=",".join(due_games))
+        run_scripts(scripts, log_file, env)
+
+        with open(log_file, "a") as log:
+            log.write(f"\n✅ Scheduled ingestion completed at {datetime.now()}\n")
+
+    # A stage that failed is not retried before its next due time, as with the daily run
+    for trigger in triggers:
+        state[trigger] = now.isoformat()
+    save_state(state)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# vocabularies.py
+
+# Dictionary encoding for the event tables (see migrations/0004_event_vocabularies.sql)
+# Text columns are replaced by smallint codes from a lookup table; values not cached yet are looked up and
+# only the new ones are inserted (one statement each), and every code is cached for the rest of the run
+
+# Text column -> (lookup table, code column)
+ENCODED_COLUMNS = {
+    "event_type": ("event_types", "event_type_id"),
+    "description": ("event_descriptions", "description_id"),
+    "zone": ("shot_zones", "zone_id")
+}
+
+# Lookup table -> {name: code}
+_codes = {}
+
+def clean_name(value):
+    # pandas hands missing values over as NaN
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    return str(value)
+
+def forget_codes():
+    # Codes added inside a rolled back transaction no longer exist
+    _codes.clear()
+
+def get_codes(cur, table, code_column, names):
+    codes = _codes.setdefault(table, {})
+    missing = sorted({name for name in names if name is not None and name not in codes})
+
+    if missing:
+        # Look the names up first: an INSERT ... ON CONFLICT draws an identity value even for the names
+        # that already exist, and a smallint identity cannot afford one per name and run
+        cur.execute(f"SELECT name, {code_column} FROM {table} WHERE name = ANY(%s)", (missing,))
+        codes.update(cur.fetchall())
+        missing = [name for name in missing if name not in codes]
+
+    if missing:
+        cur.execute(f"""
+            INSERT INTO {table} (name)
+            SELECT unnest(%s::text[])
+            ON CONFLICT (name) DO NOTHING
+            RETURNING name, {code_column}
+        """, (missing,))
+        codes.update(cur.fetchall())
+        # Names inserted meanwhile by another process
+        missing = [name for name in missing if name not in codes]
+        if missing:
+            cur.execute(f"SELECT name, {code_column} FROM {table} WHERE name = ANY(%s)", (missing,))
+            codes.update(cur.fetchall())
+
+    return codes
+
+def encode_rows(cur, rows):
+    # Replace every encoded text column present in the rows with its code column
+    if not rows:
+        return rows
+
+    for column, (table, code_column) in ENCODED_COLUMNS.items():
+        if column not in rows[0]:
+            continue
+
+        for row in rows:
+            row[column] = clean_name(row[column])
+
+        codes = get_codes(cur, table, code_column, (row[column] for row in rows))
+        for row in rows:
+            name = row.pop(column)
+            row[code_column] = codes.get(name) if name is not None else None
+
+    return rows
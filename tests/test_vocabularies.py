@@ -0,0 +1,53 @@
+import psycopg2
+import pytest
+from ingest import vocabularies
+from ingest.config import DB_CONFIG
+
+# Needs the database of DB_CONFIG; the lookup table is a temporary copy, nothing is written to the real one
+
+@pytest.fixture
+def cur():
+    try:
+        conn = psycopg2.connect(**DB_CONFIG)
+    except psycopg2.OperationalError:
+        pytest.skip("database unavailable")
+    try:
+        with conn.cursor() as cur:
+            # Shadows the real lookup table for this session
+            cur.execute("""
+                CREATE TEMP TABLE event_types (
+                    event_type_id SMALLINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE
+                )
+            """)
+            yield cur
+    finally:
+        conn.rollback()
+        conn.close()
+        vocabularies.forget_codes()
+
+def sequence_value(cur):
+    # Resolves to the identity sequence of the temporary table
+    cur.execute("SELECT pg_get_serial_sequence('event_types', 'event_type_id')")
+    cur.execute(f"SELECT last_value FROM {cur.fetchone()[0]}")
+    return cur.fetchone()[0]
+
+def test_known_names_do_not_draw_identity_values(cur):
+    names = ["2FGM", "3FGA", "EG"]
+    first = vocabularies.get_codes(cur, "event_types", "event_type_id", names).copy()
+    after_first_run = sequence_value(cur)
+
+    # A new ingest process starts with an empty cache
+    vocabularies.forget_codes()
+    second = vocabularies.get_codes(cur, "event_types", "event_type_id", names)
+
+    assert second == first
+    assert sequence_value(cur) == after_first_run
+
+def test_only_new_names_are_inserted(cur):
+    vocabularies.get_codes(cur, "event_types", "event_type_id", ["2FGM"])
+    vocabularies.forget_codes()
+    codes = vocabularies.get_codes(cur, "event_types", "event_type_id", ["2FGM", "EG"])
+
+    assert sorted(codes.values()) == [1, 2]
+    assert sequence_value(cur) == 2